@@ -4,14 +4,20 @@ Multi-Agent System for Alto Financial Assistant
 This module implements a multi-agent system using Google ADK that intelligently
 routes between calendar management and general Q&A based on user intent.
 """
+import asyncio
+import logging
+import re
+import time
 from datetime import datetime, timezone
+from typing import Any, Final
 
 import google.genai.types as genai_types
 from google.adk.agents import LlmAgent
 from google.adk.planners import BuiltInPlanner
-from google.adk.tools import FunctionTool
+from google.adk.tools import FunctionTool, ToolContext
 
 from app.config import config
+from app.utils import jsonio
 from app.tools.transaction_data import (
     get_user_transactions,
     get_transactions_by_category,
@@ -25,23 +31,331 @@ from app.tools.calendar_modifications import (
     clear_calendar_modifications,
 )
 
-# Create tools for transaction data access and calendar modifications
-transaction_tools = [
-    FunctionTool(func=get_user_transactions),
-    FunctionTool(func=get_transactions_by_category),
-    FunctionTool(func=get_transactions_by_date_range),
-    FunctionTool(func=get_recurring_payments),
-]
+logger = logging.getLogger(__name__)
 
-calendar_modification_tools = [
-    FunctionTool(func=move_transaction),
-    FunctionTool(func=add_planned_transaction),
-    FunctionTool(func=get_calendar_modifications),
-    FunctionTool(func=clear_calendar_modifications),
-]
 
-# Combine all tools
-all_tools = transaction_tools + calendar_modification_tools
+def get_current_date() -> dict:
+    """
+    Get the current date and time in UTC.
+
+    Call this when the user's request depends on today's date, e.g. scheduling
+    a payment for "tomorrow" or interpreting "this month".
+
+    Returns:
+        Dictionary with the current UTC date ("YYYY-MM-DD") and full ISO timestamp.
+    """
+    now = datetime.now(timezone.utc)
+    return {"date": now.strftime("%Y-%m-%d"), "iso_timestamp": now.isoformat()}
+
+
+class CachedFunctionTool(FunctionTool):
+    """
+    FunctionTool that memoizes results per (user, args) with a short TTL.
+
+    The instruction tells the model to call get_user_transactions() on every
+    finance turn, so in a multi-turn chat the same JSON gets re-fetched over and
+    over. Caching the read-only data tools for a minute turns those repeats into
+    dict lookups. Only use this for read-only tools — mutating tools like
+    move_transaction() must always hit the real function.
+    """
+
+    def __init__(self, *, func: Any, ttl: float = 60.0, maxsize: int = 1024):
+        super().__init__(func=func)
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._cache: dict[tuple, tuple[float, Any]] = {}
+        self._hits = 0
+
+    def _cache_key(self, args: dict, tool_context: ToolContext) -> tuple:
+        user_id = "default"
+        try:
+            user_id = tool_context._invocation_context.session.user_id or user_id
+        except Exception:
+            pass
+        return (user_id, self.name, jsonio.dumps(args, sort_keys=True, default=str))
+
+    async def run_async(self, *, args: dict, tool_context: ToolContext) -> Any:
+        key = self._cache_key(args, tool_context)
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > now:
+            self._hits += 1
+            logger.debug(
+                "Tool cache hit for %s (hit #%d) — skipped a redundant fetch",
+                self.name,
+                self._hits,
+            )
+            return entry[1]
+
+        result = await super().run_async(args=args, tool_context=tool_context)
+        if len(self._cache) >= self._maxsize:
+            # Drop expired entries first; fall back to a full reset if the
+            # cache is saturated with live keys.
+            self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+            if len(self._cache) >= self._maxsize:
+                self._cache.clear()
+        self._cache[key] = (now + self._ttl, result)
+        return result
+
+    def seed(self, args: dict, value: Any, *, user_id: str = "default") -> None:
+        """Pre-populate the cache so a speculative prefetch becomes a later hit."""
+        key = (user_id, self.name, jsonio.dumps(args, sort_keys=True, default=str))
+        self._cache[key] = (time.monotonic() + self._ttl, value)
+
+
+# Single registry of tool singletons. Every FunctionTool.__init__ reflects on
+# the Python signature and synthesizes a JSON schema, so each function is
+# wrapped exactly once here and shared by reference everywhere else.
+# The data tools are read-only, so they get the TTL cache; the calendar
+# modification tools mutate state and stay uncached.
+TOOLS: dict[str, FunctionTool] = {
+    tool.name: tool
+    for tool in (
+        CachedFunctionTool(func=get_user_transactions, ttl=60),
+        CachedFunctionTool(func=get_transactions_by_category, ttl=60),
+        CachedFunctionTool(func=get_transactions_by_date_range, ttl=60),
+        CachedFunctionTool(func=get_recurring_payments, ttl=60),
+        FunctionTool(func=move_transaction),
+        FunctionTool(func=add_planned_transaction),
+        FunctionTool(func=get_calendar_modifications),
+        FunctionTool(func=clear_calendar_modifications),
+        FunctionTool(func=get_current_date),
+    )
+}
+
+# Shared planner singleton — thinking config is identical for every agent.
+PLANNER = BuiltInPlanner(
+    thinking_config=genai_types.ThinkingConfig(
+        include_thoughts=config.include_thoughts,
+        thinking_budget=config.thinking_budget,
+    )
+)
+
+transaction_tools: Final[tuple[FunctionTool, ...]] = (
+    TOOLS["get_user_transactions"],
+    TOOLS["get_transactions_by_category"],
+    TOOLS["get_transactions_by_date_range"],
+    TOOLS["get_recurring_payments"],
+)
+
+calendar_modification_tools: Final[tuple[FunctionTool, ...]] = (
+    TOOLS["move_transaction"],
+    TOOLS["add_planned_transaction"],
+    TOOLS["get_calendar_modifications"],
+    TOOLS["clear_calendar_modifications"],
+)
+
+# Registry used by batch_tool to resolve sub-invocations by tool name
+_tool_registry = TOOLS
+
+# Cheap keyword pre-classifier: if a message looks like a finance-data turn, the
+# serving layer can start fetching transactions while the model is still in
+# prefill, overlapping tool I/O with the first LLM round-trip.
+_PREFETCH_PAT = re.compile(
+    r"payment|transaction|balance|spend|subscription|calendar|\bmy\b|\$", re.I
+)
+
+
+def message_suggests_transaction_data(message: str) -> bool:
+    """Return True if the user message will likely trigger get_user_transactions()."""
+    return bool(_PREFETCH_PAT.search(message))
+
+
+async def prefetch_user_transactions(user_id: str = "default") -> None:
+    """
+    Speculatively fetch transactions and warm the tool cache.
+
+    If the model never asks for the data, the prefetch simply expires with the
+    cache entry — the fetch is a local file read, so misprediction is cheap.
+    """
+    tool = TOOLS["get_user_transactions"]
+    if not isinstance(tool, CachedFunctionTool):
+        return
+    result = await asyncio.to_thread(get_user_transactions, user_id)
+    # Seed both arg shapes the model uses (bare call and explicit user_id).
+    tool.seed({}, result, user_id=user_id)
+    tool.seed({"user_id": user_id}, result, user_id=user_id)
+
+
+async def batch_tool(invocations: list[dict], tool_context: ToolContext) -> list[dict]:
+    """
+    Execute several tool calls at once instead of one per turn.
+
+    Use this when you need the results of MULTIPLE independent tools (e.g. both
+    get_user_transactions() and get_recurring_payments()) — one batch_tool call
+    runs them all in parallel and returns every result in one observation.
+
+    Args:
+        invocations: List of {"name": tool_name, "arguments": {...}} dicts.
+                     "arguments" may be omitted for zero-argument tools.
+
+    Returns:
+        List of {"name": ..., "result": ...} dicts in the same order as the
+        invocations; failed sub-calls return {"name": ..., "error": ...} instead.
+
+    Example:
+        batch_tool(invocations=[
+            {"name": "get_user_transactions", "arguments": {}},
+            {"name": "get_recurring_payments", "arguments": {}},
+        ])
+    """
+    names: list[str] = []
+    pending: list[Any] = []
+    for invocation in invocations:
+        name = str(invocation.get("name", ""))
+        names.append(name)
+        tool = _tool_registry.get(name)
+        if tool is None:
+            pending.append(_unknown_tool(name))
+            continue
+        args = invocation.get("arguments") or {}
+        pending.append(tool.run_async(args=args, tool_context=tool_context))
+
+    results = await asyncio.gather(*pending, return_exceptions=True)
+
+    batched: list[dict] = []
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            batched.append({"name": name, "error": str(result)})
+        else:
+            batched.append({"name": name, "result": result})
+    return batched
+
+
+async def _unknown_tool(name: str) -> dict:
+    raise ValueError(f"Unknown tool in batch_tool invocation: {name!r}")
+
+
+BATCH_TOOL = FunctionTool(func=batch_tool)
+
+# Immutable combined tool set — safe to share across agents by reference.
+# ADK wants a list at the call site, so materialize with list(ALL_TOOLS) there.
+ALL_TOOLS: Final[tuple[FunctionTool, ...]] = (*TOOLS.values(), BATCH_TOOL)
+
+# Narrow tool subsets for request-scoped agents. Every registered tool schema
+# is serialized into the prompt on every turn, so routed requests should carry
+# the smallest surface that can answer them.
+READ_TOOLS = (
+    TOOLS["get_user_transactions"],
+    TOOLS["get_transactions_by_category"],
+    TOOLS["get_transactions_by_date_range"],
+    TOOLS["get_recurring_payments"],
+    TOOLS["get_current_date"],
+)
+WRITE_TOOLS = READ_TOOLS + (
+    TOOLS["move_transaction"],
+    TOOLS["add_planned_transaction"],
+    TOOLS["get_calendar_modifications"],
+    TOOLS["clear_calendar_modifications"],
+    BATCH_TOOL,
+)
+NO_TOOLS: tuple = ()
+
+
+def tools_for_intent(intent: str) -> list[FunctionTool]:
+    """Map a routed intent label (read/write/general) to its tool subset."""
+    if intent == "read":
+        return list(READ_TOOLS)
+    if intent == "write":
+        return list(WRITE_TOOLS)
+    return list(NO_TOOLS)
+
+
+def _install_parallel_tool_execution() -> None:
+    """
+    Patch ADK's sequential tool dispatch so independent tool calls run concurrently.
+
+    google-adk 1.6.1 executes the model's FunctionCalls one after another inside
+    handle_function_calls_async, so a turn that needs e.g. get_user_transactions()
+    AND get_recurring_payments() pays the sum of both latencies instead of the max.
+    We split a multi-call event into single-call events, run each through the stock
+    handler via asyncio.gather, and stitch the FunctionResponse parts back together
+    in the original call order.
+    """
+    try:
+        from google.adk.flows.llm_flows import functions as adk_functions
+    except Exception:
+        return
+
+    original = adk_functions.handle_function_calls_async
+    if getattr(original, "_alto_parallel", False):
+        return  # already patched (e.g. module reimported)
+
+    async def handle_function_calls_async(
+        invocation_context, function_call_event, tools_dict, *args, **kwargs
+    ):
+        function_calls = function_call_event.get_function_calls()
+        if len(function_calls) <= 1:
+            return await original(
+                invocation_context, function_call_event, tools_dict, *args, **kwargs
+            )
+
+        sub_events = []
+        for part in function_call_event.content.parts:
+            if not getattr(part, "function_call", None):
+                continue
+            sub_event = function_call_event.model_copy(deep=True)
+            sub_event.content.parts = [part]
+            sub_events.append(sub_event)
+
+        response_events = await asyncio.gather(
+            *(
+                original(invocation_context, event, tools_dict, *args, **kwargs)
+                for event in sub_events
+            )
+        )
+        response_events = [event for event in response_events if event is not None]
+        if not response_events:
+            return None
+
+        # Merge responses back into one event, preserving the call order.
+        merged = response_events[0]
+        for extra in response_events[1:]:
+            merged.content.parts.extend(extra.content.parts)
+        return merged
+
+    handle_function_calls_async._alto_parallel = True  # type: ignore[attr-defined]
+    adk_functions.handle_function_calls_async = handle_function_calls_async
+
+
+_install_parallel_tool_execution()
+
+INSTRUCTION = """
+You are Alto, a financial assistant with tool access to the user's transaction
+data and payment calendar. Tool parameters and semantics come from the tool
+declarations; do not guess fields that are not in the data.
+
+**Workflow for transaction/calendar requests:**
+1. Fetch data first: call get_user_transactions(); use batch_tool to combine it
+   with get_recurring_payments() or other independent lookups in ONE response.
+2. Analyze timing problems (overdraft risk, high utilization) using the real
+   merchants, amounts, and dates you received.
+3. To reschedule a payment, call move_transaction() with the transaction_id
+   taken from the fetched data (e.g. "txn_010") plus merchant, dates, amount,
+   and a reason; use add_planned_transaction() for new future payments.
+4. Summarize the buffer impact (balance - upcoming expenses) and WHY each
+   change improves cashflow.
+
+**General finance questions:** answer educationally in clear, simple terms with
+a short example; no tools needed.
+
+**Rules:**
+- Never invent data; cite actual merchants, amounts, and dates from tool results.
+- Always include transaction_id when calling move_transaction().
+- Call get_current_date() when the user says "today", "tomorrow", "this month".
+- Batch independent tool calls in a single response so they run in parallel.
+
+Example: "Your balance is $1,342.55. The $1,200 Avalon Apartments rent on the
+15th risks an overdraft, so I moved it (txn_010) to the 5th, right after your
+$2,400 ACME paycheck clears."
+"""
+
+
+# Gemini context caching (cached_content) is deliberately NOT wired up here:
+# these agents carry tools, and ADK 1.6.1 unconditionally appends the tool
+# declarations (and the instruction) into the per-request config, which Gemini
+# rejects when combined with cached_content. Tool-less agents can opt in via
+# app.agents.context_cache instead.
 
 # For now, using a unified agent that can handle both calendar and Q&A
 # Multi-agent delegation will be added after verifying basic streaming works
@@ -49,102 +363,38 @@ root_agent = LlmAgent(
     name=config.internal_agent_name,
     model=config.model,
     description="Alto's financial assistant that helps with transaction analysis, payment optimization, calendar modifications, and financial education.",
-    tools=all_tools,  # Add all transaction and calendar tools
-    planner=BuiltInPlanner(
-        thinking_config=genai_types.ThinkingConfig(include_thoughts=True)
-    ),
-    instruction=f"""
-    You are Alto, a helpful financial assistant with access to user transaction data.
-
-    **YOUR TOOLS - USE THESE TO ACCESS AND MODIFY DATA:**
-    
-    📊 Transaction Data Tools:
-    1. `get_user_transactions()` - Gets ALL user transactions, accounts, and summary
-    2. `get_transactions_by_category(category)` - Gets transactions by category (FOOD_AND_DRINK, ENTERTAINMENT, etc.)
-    3. `get_transactions_by_date_range(start_date, end_date)` - Gets transactions in a date range
-    4. `get_recurring_payments()` - Identifies recurring payments like subscriptions
-    
-    📅 Calendar Modification Tools:
-    5. `move_transaction(transaction_id, merchant_name, original_date, new_date, amount, reason)` - Suggest moving a payment to a new date
-    6. `add_planned_transaction(merchant_name, date, amount, category, reason)` - Add a planned future payment
-    7. `get_calendar_modifications()` - See all current calendar modifications
-    8. `clear_calendar_modifications()` - Reset calendar to original dates
-
-    **1. Transaction Analysis & Calendar Optimization**
-    When users ask about their transactions, payments, or calendar timing:
-    - **ALWAYS use get_user_transactions() first** to see their data
-    - Analyze their transaction data and spending patterns
-    - Reference SPECIFIC merchants, amounts, and dates from the data
-    - **Use move_transaction() to suggest moving payments** to better dates
-    - **Use add_planned_transaction()** to add future planned payments
-    - Calculate buffer impacts (current balance - expenses)
-    - Identify recurring payments and subscriptions
-    - Explain WHY each move improves their cashflow
-    
-    **When optimizing the calendar:**
-    1. Call get_user_transactions() to see all data
-    2. Identify problematic timing (overdraft risks, high utilization)
-    3. For EACH transaction you want to move:
-       a. Find it in the transaction data
-       b. Extract its transaction_id field (e.g., "txn_010")
-       c. Call move_transaction() with ALL required parameters including the transaction_id
-    4. Provide clear reasoning for each move
-    5. Summarize the overall impact on cashflow
-    
-    **CRITICAL:** Always include the transaction_id when calling move_transaction() or add_planned_transaction().
-    Get the transaction_id from the transaction data returned by get_user_transactions().
-
-    **2. Financial Education & Q&A**
-    When users ask general financial questions:
-    - Explain financial concepts in clear, simple terms
-    - Answer questions about budgeting and money management
-    - Provide guidance on savings strategies
-    - Explain credit scores and utilization
-    - Offer best practices and general advice
-    - Use examples to illustrate concepts
-
-    **HOW TO RESPOND:**
-    1. **If user asks about transactions/payments:**
-       - Call `get_user_transactions()` FIRST
-       - Analyze the actual data you receive
-       - Reference specific transactions in your response
-       - Example: "I see your $1200 rent payment to Avalon Apartments on the 15th..."
-
-    2. **If user asks to optimize calendar/move payments:**
-       - Call `get_user_transactions()` FIRST
-       - Identify which transactions to move
-       - For EACH transaction: extract its transaction_id, merchant_name, date, and amount
-       - Call `move_transaction(transaction_id="txn_XXX", merchant_name="...", ...)` with ALL fields
-       - Example: If you find a transaction with transaction_id "txn_010", name "Rent", amount 1200, date "2023-09-15"
-         Then call: move_transaction("txn_010", "Rent", "2023-09-15", "2023-09-05", 1200, "reason...")
-
-    3. **If user asks general questions:**
-       - Provide educational content
-       - Use examples to explain
-       - No need to call tools
-
-    4. **Always be specific:**
-       - Use actual merchant names, amounts, dates from the data
-       - Calculate real numbers (balances, totals, etc.)
-       - Provide actionable recommendations
-
-    **IMPORTANT:**
-    - ALWAYS call get_user_transactions() when analyzing finances
-    - Reference REAL data from the tools, not made-up examples
-    - Be specific with merchants and amounts
-    - Current date: {datetime.now(timezone.utc).strftime("%Y-%m-%d")}
-
-    Example good response:
-    "Looking at your transaction data, I can see you have a current balance of $1,342.55. 
-    You had income of $2,400 from ACME Corp on September 1st. Your largest expense is the 
-    $1,200 rent payment to Avalon Apartments on the 15th. You also have recurring subscriptions: 
-    Spotify ($13.99) and Netflix ($9.99)..."
-    """,
+    tools=list(ALL_TOOLS),  # Add all transaction and calendar tools
+    planner=PLANNER,
+    # ADK delivers `instruction` through Gemini's native system_instruction
+    # slot (see google.adk llm_request.append_instructions), so it stays out
+    # of the conversation window and the backend can reuse its KV prefix.
+    instruction=INSTRUCTION,
     output_key="response",
 )
 
-print(f"\n🤖 Alto Agent Initialized:")
-print(f"  Agent Name: {root_agent.name}")
-print(f"  Model: {config.model}")
-print(f"  Tools: {len(all_tools)} tools ({len(transaction_tools)} data + {len(calendar_modification_tools)} calendar)")
-print(f"  Capabilities: Transaction Analysis, Calendar Optimization & Financial Q&A")
+def create_scoped_agent(intent: str) -> LlmAgent:
+    """
+    Build a request-scoped agent carrying only the tools the intent needs.
+
+    Tool and planner objects are module singletons, so this is just list
+    assembly — the expensive schema generation already happened at import.
+    """
+    return LlmAgent(
+        name=f"{config.internal_agent_name}_{intent}",
+        model=config.model,
+        description=root_agent.description,
+        tools=tools_for_intent(intent),
+        planner=PLANNER,
+        instruction=INSTRUCTION,
+        output_key="response",
+    )
+
+
+logger.info(
+    "Alto agent initialized: name=%s model=%s tools=%d (%d data + %d calendar)",
+    root_agent.name,
+    config.model,
+    len(ALL_TOOLS),
+    len(transaction_tools),
+    len(calendar_modification_tools),
+)
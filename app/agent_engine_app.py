@@ -5,47 +5,173 @@ AND
 FastAPI service for local/dev usage (ingestion + planning).
 
 - To run the HTTP API locally:
-    uvicorn app.agent_engine_app:app --host 0.0.0.0 --port 8080 --reload
+    uvicorn app.agent_engine_app:app --loop uvloop --http httptools --host 0.0.0.0 --port 8080 --reload
 
 - To deploy to Vertex AI Agent Engine:
     python -m app.agent_engine_app   # (or set TRIGGER_DEPLOY=true and run)
 """
 
 from __future__ import annotations
-from typing import Any, Dict, List, Optional, Literal
-from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from datetime import datetime
+import asyncio
+import hashlib
 import os
 import json
-import copy
-import datetime as _dt_module
+import re
 from pathlib import Path
 
-from app.tools.calendar import optimize_calendar, derive_month, pick_focus
+from app.tools.calendar import _totals, optimize_calendar, derive_month, pick_focus
 from app.tools.explain import explain_plan, fallback_explain
+from app.utils import jsonio
+from app.utils.typing import PlanPayload
 
-# ----------------- Optional Google/ADK imports (guarded) -----------------
-_GOOGLE_OK = True
-try:
-    import vertexai
-    from google.adk.artifacts import GcsArtifactService
-    from google.cloud import logging as google_cloud_logging
-    from opentelemetry import trace
-    from opentelemetry.sdk.trace import TracerProvider, export
-    from vertexai import agent_engines
-    from vertexai.preview.reasoning_engines import AdkApp
-    from app.agent import root_agent
-    from app.config import config, get_deployment_config
-    from app.utils.gcs import create_bucket_if_not_exists
-    from app.utils.tracing import CloudTraceLoggingSpanExporter
-    from app.utils.typing import Feedback
-except Exception:
-    _GOOGLE_OK = False
+# ----------------- Optional Google/ADK imports (lazy) -----------------
+# vertexai transitively pulls grpc/protobuf and friends — hundreds of ms of
+# cold start and tens of MB of RSS that FastAPI-only planner workers never
+# touch. The stack is imported on first use (streaming endpoint or deploy).
+import importlib.util
+from types import SimpleNamespace
+
+_GOOGLE_OK: Optional[bool] = None  # unknown until _load_google_stack() runs
+_google: Optional[SimpleNamespace] = None
+
+
+def _google_available() -> bool:
+    """Cheap availability probe for /health — checks specs, imports nothing."""
+    if _GOOGLE_OK is not None:
+        return _GOOGLE_OK
+    return importlib.util.find_spec("vertexai") is not None
+
+
+def _load_google_stack() -> Optional[SimpleNamespace]:
+    """Import and cache the Google/ADK stack on first use."""
+    global _GOOGLE_OK, _google
+    if _GOOGLE_OK is not None:
+        return _google
+    try:
+        import vertexai
+        from google.adk.agents.run_config import RunConfig, StreamingMode
+        from google.adk.artifacts import GcsArtifactService
+        from google.adk.runners import InMemoryRunner
+        from google.cloud import logging as google_cloud_logging
+        from google.genai import types as genai_types
+        from opentelemetry import trace
+        from opentelemetry.sdk.trace import TracerProvider, export
+        from vertexai import agent_engines
+        from vertexai.preview.reasoning_engines import AdkApp
+        from app.agent import (
+            message_suggests_transaction_data,
+            prefetch_user_transactions,
+            root_agent,
+        )
+        from app.config import config, get_deployment_config
+        from app.utils.gcs import create_bucket_if_not_exists
+        from app.utils.tracing import CloudTraceLoggingSpanExporter
+        from app.utils.typing import Feedback
+    except Exception:
+        _GOOGLE_OK = False
+        return None
+    _GOOGLE_OK = True
+    _google = SimpleNamespace(
+        vertexai=vertexai,
+        RunConfig=RunConfig,
+        StreamingMode=StreamingMode,
+        GcsArtifactService=GcsArtifactService,
+        InMemoryRunner=InMemoryRunner,
+        google_cloud_logging=google_cloud_logging,
+        genai_types=genai_types,
+        trace=trace,
+        TracerProvider=TracerProvider,
+        export=export,
+        agent_engines=agent_engines,
+        AdkApp=AdkApp,
+        message_suggests_transaction_data=message_suggests_transaction_data,
+        prefetch_user_transactions=prefetch_user_transactions,
+        root_agent=root_agent,
+        config=config,
+        get_deployment_config=get_deployment_config,
+        create_bucket_if_not_exists=create_bucket_if_not_exists,
+        CloudTraceLoggingSpanExporter=CloudTraceLoggingSpanExporter,
+        Feedback=Feedback,
+    )
+    return _google
 
 # ----------------- FastAPI (local/dev) -----------------
-from fastapi import FastAPI, Body
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+
+class FastCORS:
+    """
+    Minimal pure-ASGI CORS layer for the Next.js dev frontend.
+
+    Starlette's CORSMiddleware wraps every request — including sub-millisecond
+    /health and /adk/status calls — in extra request/response objects. This
+    appends the two fixed headers in the send path for allowed origins and
+    answers preflights directly; everything else passes straight through.
+    """
+
+    def __init__(self, app: Any, origins: List[str]):
+        self.app = app
+        self.origins = set(origins)
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        origin = headers.get(b"origin", b"").decode("latin-1")
+        allow = origin if origin in self.origins else ""
+
+        if (
+            allow
+            and scope.get("method") == "OPTIONS"
+            and b"access-control-request-method" in headers
+        ):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 204,
+                    "headers": [
+                        (b"access-control-allow-origin", allow.encode("latin-1")),
+                        (b"access-control-allow-credentials", b"true"),
+                        (b"access-control-allow-methods", b"*"),
+                        (
+                            b"access-control-allow-headers",
+                            headers.get(b"access-control-request-headers", b"*"),
+                        ),
+                        (b"access-control-max-age", b"600"),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if not allow:
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers") or []) + [
+                    (b"access-control-allow-origin", allow.encode("latin-1")),
+                    (b"access-control-allow-credentials", b"true"),
+                ]
+            await send(message)
 
-USE_OPENROUTER = os.getenv("USE_OPENROUTER", "false").lower() in {"1", "true", "yes"}
+        await self.app(scope, receive, send_wrapper)
+
+# Env flags are read once at import; downstream branches test a module bool
+# instead of repeating the getenv + lower + set-membership dance.
+_TRUTHY = frozenset({"1", "true", "yes", "y", "on"})
+
+
+def _envbool(key: str, default: str = "false") -> bool:
+    return os.environ.get(key, default).lower() in _TRUTHY
+
+
+USE_OPENROUTER = _envbool("USE_OPENROUTER")
 if USE_OPENROUTER:
     try:
         from app.llm.openrouter_client import openrouter_chat, OpenRouterError
@@ -57,7 +183,7 @@ if USE_OPENROUTER:
 
         OpenRouterError = Exception
 
-USE_GEMINI_EXPLAIN = os.getenv("USE_GEMINI_EXPLAIN", "true").lower() in {"1", "true", "yes"}
+USE_GEMINI_EXPLAIN = _envbool("USE_GEMINI_EXPLAIN", "true")
 
 # Plaid → Agent transformer
 try:
@@ -69,20 +195,17 @@ except Exception as e:
 # -----------------------------------------------------------------------------
 # FastAPI APP (local/dev)
 # -----------------------------------------------------------------------------
-app = FastAPI(title="Alto Agents")
+app = FastAPI(title="Alto Agents", default_response_class=ORJSONResponse)
 
 # Allow Next.js dev server to call us
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    FastCORS,
+    origins=["http://localhost:3000", "http://127.0.0.1:3000"],
 )
 
 @app.get("/health")
 def health():
-    return {"ok": True, "google_adk_available": _GOOGLE_OK}
+    return {"ok": True, "google_adk_available": _google_available()}
 
 
 @app.get("/adk/status")
@@ -90,13 +213,22 @@ def adk_status():
     return {"use_openrouter": bool(USE_OPENROUTER)}
 
 @app.post("/ingest/plaid-transform")
-def plaid_transform(plaid_payload: dict = Body(...)) -> dict:
+async def plaid_transform(request: Request) -> dict:
     if plaid_to_agent_payload is None:
         # Helpful error if import failed
         raise RuntimeError(
             f"ingest_plaid import failed: {_INGEST_IMPORT_ERROR}. "
             "Ensure file exists at app/alto_ingest/ingest_plaid.py and package path is correct."
         )
+    # Parse the raw body ourselves: large Plaid exports skip Body(...)'s
+    # stdlib-json decode + pydantic validation of an untyped dict, and the
+    # ORJSONResponse default serializes the result straight back to bytes.
+    body = await request.body()
+    try:
+        plaid_payload = jsonio.loads(body)
+    except Exception as e:
+        # Preserve the Body(...) contract: malformed JSON is a client error.
+        raise HTTPException(status_code=422, detail=f"Invalid JSON body: {e}") from e
     return plaid_to_agent_payload(plaid_payload)
 
 # ----------------- Calendar helpers -----------------
@@ -104,16 +236,56 @@ Date = str  # 'YYYY-MM-DD'
 
 
 def _short_id(prefix: str = "plan") -> str:
-    import random, string
-    suf = "".join(random.choices(string.ascii_lowercase + string.digits, k=6))
-    return f"{prefix}_{suf}"
+    # os.urandom(3).hex() gives 6 hex chars from one C call — no per-call
+    # random/string imports, no Python-level choice loop + join.
+    return f"{prefix}_{os.urandom(3).hex()}"
+
+# Strong references to fire-and-forget tasks (RUF006): asyncio keeps only a
+# weak reference to scheduled tasks, so anything not anchored here could be
+# collected before it finishes.
+_background_tasks: "set[asyncio.Task]" = set()
+
+# The deterministic planner is a pure function of (payload, focus), so
+# identical request bursts (frontend hot-reload, A/B probes) can share one
+# computed plan. Small hand-rolled LRU keyed by a digest of the canonical JSON.
+_PLAN_CACHE: OrderedDict = OrderedDict()
+_PLAN_CACHE_MAX = 256
+
+
+def _plan_cached(
+    data: Dict[str, Any],
+    focus: str,
+    totals: "tuple[float, float] | None" = None,
+) -> Dict[str, Any]:
+    """Memoized optimize_calendar(...).as_dict() for identical payloads."""
+    try:
+        digest = hashlib.blake2b(
+            jsonio.dumps(data, sort_keys=True, default=str).encode(),
+            digest_size=16,
+        ).digest()
+    except Exception:
+        # Unhashable/unserializable payload — just compute.
+        return optimize_calendar(data, focus=focus, totals=totals).as_dict()
+    key = (digest, focus)
+    hit = _PLAN_CACHE.get(key)
+    if hit is not None:
+        _PLAN_CACHE.move_to_end(key)
+        return hit
+    plan = optimize_calendar(data, focus=focus, totals=totals).as_dict()
+    _PLAN_CACHE[key] = plan
+    if len(_PLAN_CACHE) > _PLAN_CACHE_MAX:
+        _PLAN_CACHE.popitem(last=False)
+    return plan
+
 
 # ------------ Minimal endpoints for planner ------------
 @app.post("/optimize")
-def optimize(payload: Dict[str, Any]):
-    focus = str(payload.get("focus") or pick_focus(payload))
-    plan = optimize_calendar(payload, focus=focus)
-    plan_dict = plan.as_dict()
+def optimize(payload: PlanPayload):
+    data = payload.as_payload_dict()
+    # Compute the cash totals once and thread them through both consumers.
+    totals = _totals(data)
+    focus = str(payload.focus or pick_focus(data, totals=totals))
+    plan_dict = _plan_cached(data, focus, totals)
     return {
         "focus": focus,
         "changes": plan_dict["changes"],
@@ -121,10 +293,23 @@ def optimize(payload: Dict[str, Any]):
         "next_actions": plan_dict["next_actions"],
     }
 
+# Constant prompt pieces built once, not per /explain request.
+_SYSTEM_MSG = {"role": "system", "content": "You are Alto, a precise financial planner."}
+_EXPLAIN_PROMPT_PREFIX = (
+    "Summarize in 2–3 crisp bullets why this month’s payment schedule improves cash safety "
+    "and credit score. Avoid fluff; be concrete.\nPolicy: "
+)
+# One multiline scan that strips bullet markers and surrounding whitespace,
+# replacing the splitlines + per-line strip loop.
+_BULLET_RE = re.compile(r"^\s*[•\-]?\s*(\S.*?)\s*$", re.M)
+
+
 @app.post("/explain")
-def explain(payload: Dict[str, Any]):
-    focus = str(payload.get("focus") or pick_focus(payload))
-    plan = optimize_calendar(payload, focus=focus).as_dict()
+async def explain(payload: PlanPayload):
+    data = payload.as_payload_dict()
+    totals = _totals(data)
+    focus = str(payload.focus or pick_focus(data, totals=totals))
+    plan = _plan_cached(data, focus, totals)
 
     if USE_OPENROUTER:
         native = fallback_explain(plan, focus=focus)
@@ -132,20 +317,21 @@ def explain(payload: Dict[str, Any]):
             user_msg = {
                 "role": "user",
                 "content": (
-                    "Summarize in 2–3 crisp bullets why this month’s payment schedule improves cash safety "
-                    "and credit score. Avoid fluff; be concrete.\n"
-                    f"Policy: {json.dumps(payload.get('policy', {}))}\n"
-                    f"Income (first 4): {json.dumps(payload.get('cashIn', [])[:4])}\n"
-                    f"Bills (first 6): {json.dumps(payload.get('cashOut', [])[:6])}\n"
+                    _EXPLAIN_PROMPT_PREFIX
+                    + jsonio.dumps(payload.policy)
+                    + "\nIncome (first 4): "
+                    + jsonio.dumps(payload.cashIn[:4])
+                    + "\nBills (first 6): "
+                    + jsonio.dumps(payload.cashOut[:6])
+                    + "\n"
                 ),
             }
-            text = openrouter_chat(
-                messages=[
-                    {"role": "system", "content": "You are Alto, a precise financial planner."},
-                    user_msg,
-                ]
+            # The OpenRouter round-trip is sync HTTP; run it on a worker
+            # thread so the event loop keeps serving other requests.
+            text = await asyncio.to_thread(
+                openrouter_chat, messages=[_SYSTEM_MSG, user_msg]
             )
-            bullets = [b.strip("•- ").strip() for b in text.splitlines() if b.strip()]
+            bullets = _BULLET_RE.findall(text)
             if bullets:
                 return {"explain": bullets[:3]}
         except OpenRouterError:
@@ -154,26 +340,30 @@ def explain(payload: Dict[str, Any]):
             pass
         return {"explain": native}
 
-    bullets = explain_plan(payload, plan, focus=focus, prefer_gemini=USE_GEMINI_EXPLAIN)
+    bullets = await asyncio.to_thread(
+        explain_plan, data, plan, focus=focus, prefer_gemini=USE_GEMINI_EXPLAIN
+    )
     return {"explain": bullets}
 
 @app.post("/orchestrate/plan")
-def orchestrate_plan(payload: Dict[str, Any]):
-    if payload.get("intent", {}).get("name") == "question":
+def orchestrate_plan(payload: PlanPayload):
+    data = payload.as_payload_dict()
+    if payload.intent.get("name") == "question":
         out = {"changes": [], "metrics": {}, "explain": [
             "We respect your windows and buffer requirement.",
             "Locked items are never moved.",
             "Pre-cut payments reduce reported card utilization.",
         ]}
     else:
-        focus = payload.get("intent", {}).get("focus") or payload.get("focus") or pick_focus(payload)
+        totals = _totals(data)
+        focus = payload.intent.get("focus") or payload.focus or pick_focus(data, totals=totals)
         focus = str(focus)
-        out = optimize_calendar(payload, focus=focus).as_dict()
+        out = _plan_cached(data, focus, totals)
 
     return {
         "id": _short_id("plan"),
-        "user_id": str(payload.get("user", {}).get("id", "usr_demo")),
-        "month": derive_month(payload),
+        "user_id": str(payload.user.get("id", "usr_demo")),
+        "month": derive_month(data),
         "changes": out["changes"],
         "metrics": out.get("metrics", {}),
         "explain": out.get("explain", []),
@@ -181,10 +371,14 @@ def orchestrate_plan(payload: Dict[str, Any]):
         "next_actions": out.get("next_actions", []),
     }
 @app.post("/agent/session")
-def agent_session(payload: Dict[str, Any]):
-    focus = str(payload.get("focus") or pick_focus(payload))
-    plan = optimize_calendar(payload, focus=focus).as_dict()
-    explain_bullets = explain_plan(payload, plan, focus=focus, prefer_gemini=USE_GEMINI_EXPLAIN)
+async def agent_session(payload: PlanPayload):
+    data = payload.as_payload_dict()
+    totals = _totals(data)
+    focus = str(payload.focus or pick_focus(data, totals=totals))
+    plan = _plan_cached(data, focus, totals)
+    explain_bullets = await asyncio.to_thread(
+        explain_plan, data, plan, focus=focus, prefer_gemini=USE_GEMINI_EXPLAIN
+    )
     return {
         "focus": focus,
         "plan": plan,
@@ -193,29 +387,121 @@ def agent_session(payload: Dict[str, Any]):
     }
 
 
+# ----------------- Streaming agent endpoint -----------------
+_runner: Optional[Any] = None
+
+# Cap concurrent model runs per worker so a burst of sessions queues briefly
+# instead of fanning out unbounded Gemini calls (each with its own prefill).
+_MAX_CONCURRENT_RUNS = int(os.environ.get("ALTO_MAX_CONCURRENT_RUNS", "8"))
+_run_slots = asyncio.Semaphore(_MAX_CONCURRENT_RUNS)
+
+
+def _get_runner(g: SimpleNamespace) -> Any:
+    """Lazily build one shared in-memory runner for the streaming endpoint."""
+    global _runner
+    if _runner is None:
+        _runner = g.InMemoryRunner(agent=g.root_agent, app_name="alto")
+    return _runner
+
+
+@app.post("/agent/stream")
+async def agent_stream(payload: Dict[str, Any]):
+    """
+    Stream the agent's answer as SSE instead of buffering the full response.
+
+    Tokens flush to the client as Gemini generates them, so first-byte
+    latency is bounded by prefill rather than the whole decode.
+    """
+    g = _load_google_stack()
+    if g is None:
+        raise HTTPException(status_code=503, detail="Google ADK stack not installed")
+
+    message = str(payload.get("message", ""))
+    user_id = str(payload.get("user_id", "default"))
+    session_id = str(payload.get("session_id") or _short_id("sess"))
+
+    runner = _get_runner(g)
+    session = await runner.session_service.get_session(
+        app_name=runner.app_name, user_id=user_id, session_id=session_id
+    )
+    if session is None:
+        await runner.session_service.create_session(
+            app_name=runner.app_name, user_id=user_id, session_id=session_id
+        )
+
+    # Speculative prefetch: start the transaction fetch now so it overlaps
+    # the model's prefill; if the agent asks for it, the cache is warm.
+    if g.message_suggests_transaction_data(message):
+        task = asyncio.create_task(g.prefetch_user_transactions(user_id))
+        # The loop only holds a weak reference to tasks; keep a strong one so
+        # the prefetch cannot be garbage-collected mid-flight.
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    async def event_source():
+        content = g.genai_types.Content(
+            role="user", parts=[g.genai_types.Part(text=message)]
+        )
+        run_config = g.RunConfig(streaming_mode=g.StreamingMode.SSE)
+        async with _run_slots:
+            async for event in runner.run_async(
+                user_id=user_id,
+                session_id=session_id,
+                new_message=content,
+                run_config=run_config,
+            ):
+                parts = event.content.parts if event.content else []
+                for part in parts:
+                    text = getattr(part, "text", None)
+                    if text:
+                        yield f"data: {json.dumps({'text': text})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"X-Session-Id": session_id},
+    )
+
+
 # -----------------------------------------------------------------------------
-# ADK / Vertex AI Agent Engine deployment bits (unchanged; guarded)
+# ADK / Vertex AI Agent Engine deployment bits (lazily defined)
 # -----------------------------------------------------------------------------
-if _GOOGLE_OK:
-    class AgentEngineApp(AdkApp):
+_AgentEngineApp: Optional[type] = None
+
+
+def get_agent_engine_app_class() -> type:
+    """Define (once) and return the AgentEngineApp class.
+
+    Built lazily so importing this module for the FastAPI planner does not pull
+    vertexai / opentelemetry; the class only exists on the deploy path.
+    """
+    global _AgentEngineApp
+    if _AgentEngineApp is not None:
+        return _AgentEngineApp
+    g = _load_google_stack()
+    if g is None:
+        raise RuntimeError("Google ADK/VertexAI libraries not available in this environment.")
+
+    class AgentEngineApp(g.AdkApp):
         """ADK Application wrapper for Agent Engine deployment."""
         def set_up(self) -> None:
             super().set_up()
-            logging_client = google_cloud_logging.Client()
+            logging_client = g.google_cloud_logging.Client()
             self.logger = logging_client.logger(__name__)
-            provider = TracerProvider()
-            processor = export.BatchSpanProcessor(
-                CloudTraceLoggingSpanExporter(
+            provider = g.TracerProvider()
+            processor = g.export.BatchSpanProcessor(
+                g.CloudTraceLoggingSpanExporter(
                     project_id=os.environ.get("GOOGLE_CLOUD_PROJECT"),
-                    service_name=f"{config.deployment_name}-service",
+                    service_name=f"{g.config.deployment_name}-service",
                 )
             )
             provider.add_span_processor(processor)
-            trace.set_tracer_provider(provider)
+            g.trace.set_tracer_provider(provider)
             self.enable_tracing = True
 
         def register_feedback(self, feedback: dict[str, Any]) -> None:
-            feedback_obj = Feedback.model_validate(feedback)
+            feedback_obj = g.Feedback.model_validate(feedback)
             self.logger.log_struct(feedback_obj.model_dump(), severity="INFO")
 
         def register_operations(self) -> dict[str, list[str]]:
@@ -225,91 +511,110 @@ if _GOOGLE_OK:
 
         def clone(self) -> "AgentEngineApp":
             template_attributes = self._tmpl_attrs
+            # ADK agents carry no per-session mutable state, so clones can share
+            # the template agent graph by reference instead of paying a full
+            # deepcopy per scale-out. deep_clone_agent=True opts back in.
+            agent = template_attributes["agent"]
+            if template_attributes.get("deep_clone_agent", False):
+                import copy
+
+                agent = copy.deepcopy(agent)
             return self.__class__(
-                agent=copy.deepcopy(template_attributes["agent"]),
+                agent=agent,
                 enable_tracing=bool(template_attributes.get("enable_tracing", False)),
                 session_service_builder=template_attributes.get("session_service_builder"),
                 artifact_service_builder=template_attributes.get("artifact_service_builder"),
                 env_vars=template_attributes.get("env_vars"),
             )
 
-    def deploy_agent_engine_app() -> agent_engines.AgentEngine:
-        """Deploy the agent to Vertex AI Agent Engine."""
-        print("🚀 Starting Agent Engine deployment...")
-
-        deployment_config = get_deployment_config()
-        print(f"📋 Deploying agent: {deployment_config.agent_name}")
-        print(f"📋 Project: {deployment_config.project}")
-        print(f"📋 Location: {deployment_config.location}")
-        print(f"📋 Staging bucket: {deployment_config.staging_bucket}")
-
-        env_vars: Dict[str, str] = {}
-        env_vars["NUM_WORKERS"] = "1"
-
-        artifacts_bucket_name = f"{deployment_config.project}-{deployment_config.agent_name}-logs-data"
-        print(f"📦 Creating artifacts bucket: {artifacts_bucket_name}")
-        create_bucket_if_not_exists(
-            bucket_name=artifacts_bucket_name,
-            project=deployment_config.project,
-            location=deployment_config.location,
-        )
-
-        vertexai.init(
-            project=deployment_config.project,
-            location=deployment_config.location,
-            staging_bucket=f"gs://{deployment_config.staging_bucket}",
-        )
+    _AgentEngineApp = AgentEngineApp
+    return _AgentEngineApp
+
+
+def deploy_agent_engine_app() -> Any:
+    """Deploy the agent to Vertex AI Agent Engine."""
+    print("🚀 Starting Agent Engine deployment...")
+
+    g = _load_google_stack()
+    if g is None:
+        raise RuntimeError("Google ADK/VertexAI libraries not available in this environment.")
+    AgentEngineApp = get_agent_engine_app_class()
+
+    deployment_config = g.get_deployment_config()
+    print(f"📋 Deploying agent: {deployment_config.agent_name}")
+    print(f"📋 Project: {deployment_config.project}")
+    print(f"📋 Location: {deployment_config.location}")
+    print(f"📋 Staging bucket: {deployment_config.staging_bucket}")
+
+    env_vars: Dict[str, str] = {}
+    env_vars["NUM_WORKERS"] = "1"
+
+    artifacts_bucket_name = f"{deployment_config.project}-{deployment_config.agent_name}-logs-data"
+    print(f"📦 Creating artifacts bucket: {artifacts_bucket_name}")
+    g.create_bucket_if_not_exists(
+        bucket_name=artifacts_bucket_name,
+        project=deployment_config.project,
+        location=deployment_config.location,
+    )
+
+    g.vertexai.init(
+        project=deployment_config.project,
+        location=deployment_config.location,
+        staging_bucket=f"gs://{deployment_config.staging_bucket}",
+    )
+
+    with open(deployment_config.requirements_file) as f:
+        requirements = f.read().strip().split("\n")
+
+    agent_engine = AgentEngineApp(
+        agent=g.root_agent,
+        artifact_service_builder=lambda: g.GcsArtifactService(bucket_name=artifacts_bucket_name),
+    )
+
+    agent_config = {
+        "agent_engine": agent_engine,
+        "display_name": deployment_config.agent_name,
+        "description": "Alto: An AI-powered financial assistant for transaction analysis and calendar optimization",
+        "extra_packages": deployment_config.extra_packages,
+        "env_vars": env_vars,
+        "requirements": requirements,
+    }
 
-        with open(deployment_config.requirements_file) as f:
-            requirements = f.read().strip().split("\n")
+    existing = list(g.agent_engines.list(filter=f"display_name={deployment_config.agent_name}"))
+    if existing:
+        print(f"🔄 Updating existing agent: {deployment_config.agent_name}")
+        remote = existing[0].update(**agent_config)
+    else:
+        print(f"🆕 Creating new agent: {deployment_config.agent_name}")
+        remote = g.agent_engines.create(**agent_config)
+
+    metadata = {
+        "remote_agent_engine_id": remote.resource_name,
+        "deployment_timestamp": datetime.now().isoformat(),
+        "agent_name": deployment_config.agent_name,
+        "project": deployment_config.project,
+        "location": deployment_config.location,
+    }
 
-        agent_engine = AgentEngineApp(
-            agent=root_agent,
-            artifact_service_builder=lambda: GcsArtifactService(bucket_name=artifacts_bucket_name),
-        )
+    logs_dir = Path("logs"); logs_dir.mkdir(exist_ok=True)
+    meta_file = logs_dir / "deployment_metadata.json"
+    # Write-then-rename so a crash mid-write never leaves a truncated file.
+    tmp_file = meta_file.with_suffix(".json.tmp")
+    tmp_file.write_text(jsonio.dumps(metadata, sort_keys=True))
+    tmp_file.replace(meta_file)
 
-        agent_config = {
-            "agent_engine": agent_engine,
-            "display_name": deployment_config.agent_name,
-            "description": "Alto: An AI-powered financial assistant for transaction analysis and calendar optimization",
-            "extra_packages": deployment_config.extra_packages,
-            "env_vars": env_vars,
-            "requirements": requirements,
-        }
-
-        existing = list(agent_engines.list(filter=f"display_name={deployment_config.agent_name}"))
-        if existing:
-            print(f"🔄 Updating existing agent: {deployment_config.agent_name}")
-            remote = existing[0].update(**agent_config)
-        else:
-            print(f"🆕 Creating new agent: {deployment_config.agent_name}")
-            remote = agent_engines.create(**agent_config)
-
-        metadata = {
-            "remote_agent_engine_id": remote.resource_name,
-            "deployment_timestamp": _dt_module.datetime.now().isoformat(),
-            "agent_name": deployment_config.agent_name,
-            "project": deployment_config.project,
-            "location": deployment_config.location,
-        }
-
-        logs_dir = Path("logs"); logs_dir.mkdir(exist_ok=True)
-        meta_file = logs_dir / "deployment_metadata.json"
-        with open(meta_file, "w") as f:
-            json.dump(metadata, f, indent=2)
-
-        print("✅ Agent deployed successfully!")
-        print(f"📄 Deployment metadata saved to: {meta_file}")
-        print(f"🆔 Agent Engine ID: {remote.resource_name}")
-        return remote
+    print("✅ Agent deployed successfully!")
+    print(f"📄 Deployment metadata saved to: {meta_file}")
+    print(f"🆔 Agent Engine ID: {remote.resource_name}")
+    return remote
 
 # -----------------------------------------------------------------------------
 # Script entrypoint
 # -----------------------------------------------------------------------------
 if __name__ == "__main__":
     # Only attempt deploy if explicitly requested or Google stack is available.
-    if os.getenv("TRIGGER_DEPLOY", "false").lower() in {"1","true","yes"}:
-        if not _GOOGLE_OK:
+    if _envbool("TRIGGER_DEPLOY"):
+        if _load_google_stack() is None:
             raise RuntimeError("Google ADK/VertexAI libraries not available in this environment.")
         print(
             """
@@ -321,4 +626,4 @@ if __name__ == "__main__":
         deploy_agent_engine_app()
     else:
         # Convenience for local testing
-        print("Local mode: start with uvicorn → uvicorn app.agent_engine_app:app --port 8080 --reload")
+        print("Local mode: start with uvicorn → uvicorn app.agent_engine_app:app --loop uvloop --http httptools --port 8080 --reload")
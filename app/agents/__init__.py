@@ -6,11 +6,15 @@ Coordinator/Dispatcher pattern for intelligent request routing.
 """
 from app.agents.calendar_agent import create_calendar_agent
 from app.agents.coordinator_agent import create_coordinator_agent
+from app.agents.plan_agent import create_plan_agent
 from app.agents.qa_agent import create_qa_agent
+from app.agents.router_agent import create_router_agent
 
 __all__ = [
     "create_calendar_agent",
     "create_qa_agent",
     "create_coordinator_agent",
+    "create_router_agent",
+    "create_plan_agent",
 ]
 
@@ -3,26 +3,17 @@ Calendar Management Agent - Analyzes transaction data and suggests calendar opti
 """
 from datetime import datetime, timezone
 
+from functools import lru_cache
+from typing import Optional
+
 import google.genai.types as genai_types
 from google.adk.agents import LlmAgent
 from google.adk.planners import BuiltInPlanner
 
+from app.agents.context_cache import instruction_cache_name
 from app.config import config
 
-
-def create_calendar_agent() -> LlmAgent:
-    """
-    This agent analyzes financial transactions, payment schedules,
-    and suggests optimal timing for payments to improve cashflow.
-    """
-    return LlmAgent(
-        name="calendar_manager",
-        model=config.model,
-        description="Specializes in analyzing transaction data, payment schedules, and optimizing calendar timing for financial transactions.",
-        planner=BuiltInPlanner(
-            thinking_config=genai_types.ThinkingConfig(include_thoughts=True)
-        ),
-        instruction=f"""
+_CALENDAR_INSTRUCTION_TEMPLATE = """
         You are Alto's Calendar Management Specialist. Your expertise is in analyzing financial transactions
         and payment schedules to help users optimize their cashflow.
 
@@ -48,7 +39,7 @@ def create_calendar_agent() -> LlmAgent:
         - Reasoning for each recommendation
         
         **Current Context:**
-        - Current date: {datetime.now(timezone.utc).strftime("%Y-%m-%d")}
+        - Current date: {current_date}
         - Focus on protecting minimum buffer while optimizing payment timing
         
         **Important:**
@@ -69,7 +60,46 @@ def create_calendar_agent() -> LlmAgent:
         
         Use your reasoning to think through the calendar optimization step-by-step,
         then provide clear recommendations.
-        """,
+"""
+
+
+def _today_utc() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+
+def create_calendar_agent() -> LlmAgent:
+    """
+    This agent analyzes financial transactions, payment schedules,
+    and suggests optimal timing for payments to improve cashflow.
+    """
+    instruction = _CALENDAR_INSTRUCTION_TEMPLATE.format(current_date=_today_utc())
+    # The memo below is keyed on the live cache name, so the agent rebuilds
+    # when the server-side cache is refreshed (or the date-stamped instruction
+    # rotates) instead of carrying an expired cached_content name forever.
+    return _build_calendar_agent(instruction, instruction_cache_name(instruction))
+
+
+@lru_cache(maxsize=4)
+def _build_calendar_agent(instruction: str, cache_name: Optional[str]) -> LlmAgent:
+    return LlmAgent(
+        name="calendar_manager",
+        model=config.model,
+        description="Specializes in analyzing transaction data, payment schedules, and optimizing calendar timing for financial transactions.",
+        planner=BuiltInPlanner(
+            thinking_config=genai_types.ThinkingConfig(
+                include_thoughts=config.include_thoughts,
+                thinking_budget=config.thinking_budget,
+            )
+        ),
+        # A live cache serves the instruction from cached_content; sending it
+        # inline as well would be rejected by Gemini (and double-bill the prefix).
+        instruction="" if cache_name else instruction,
+        generate_content_config=(
+            genai_types.GenerateContentConfig(cached_content=cache_name)
+            if cache_name
+            else None
+        ),
         output_key="calendar_analysis",
     )
 
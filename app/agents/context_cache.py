@@ -0,0 +1,95 @@
+"""
+Shared Gemini context-cache helper for the agent factories
+
+Only usable by tool-less agents: ADK appends tool declarations into the
+per-request config, and Gemini rejects cached_content combined with tools.
+Factories that get a cache name back MUST also blank their inline
+instruction — Gemini likewise rejects cached_content alongside
+system_instruction, and ADK forwards a non-empty instruction into that slot
+on every call.
+"""
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+import google.genai.types as genai_types
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+# Server-side cache lifetime, and how long before expiry we proactively mint a
+# replacement. Handing out a name right up to the TTL would leave a window
+# where calls reference an already-expired cache and fail.
+_TTL_S = 3600.0
+_REFRESH_MARGIN_S = 300.0
+
+# instruction -> (cache name, monotonic creation time). A plain dict instead
+# of lru_cache because entries must age out: a memoized name that outlives the
+# server-side TTL turns every consumer call into a hard failure.
+_entries: Dict[str, Tuple[str, float]] = {}
+_MAX_ENTRIES = 8
+
+
+def _create_cache(instruction: str) -> str:
+    """Return a live context-cache name for *instruction*, minting as needed.
+
+    The entry is reused until _REFRESH_MARGIN_S before the server-side TTL,
+    then recreated, so consumers never hold a name for an expired cache. An
+    instruction that embeds the current date naturally gets a fresh entry
+    after UTC midnight because the lookup key changes.
+    """
+    now = time.monotonic()
+    entry = _entries.get(instruction)
+    if entry is not None and now - entry[1] < _TTL_S - _REFRESH_MARGIN_S:
+        return entry[0]
+
+    from google import genai
+
+    client = genai.Client(vertexai=True)
+    cache = client.caches.create(
+        model=config.model,
+        config=genai_types.CreateCachedContentConfig(
+            system_instruction=instruction,
+            ttl=f"{int(_TTL_S)}s",
+        ),
+    )
+    if len(_entries) >= _MAX_ENTRIES:
+        # Rotated instructions (e.g. date-stamped) accumulate; drop the oldest.
+        oldest = min(_entries, key=lambda key: _entries[key][1])
+        del _entries[oldest]
+    _entries[instruction] = (cache.name, now)
+    return cache.name
+
+
+def instruction_cache_name(instruction: str) -> Optional[str]:
+    """Return the current cache name for *instruction*, or None when disabled.
+
+    The multi-kilobyte specialist instructions are re-sent as prefix on every
+    turn; registering them as Gemini cached content means they are tokenized
+    and KV-prefilled once per TTL window instead of per request. Disabled
+    unless ALTO_PROMPT_CACHE is set. The name rotates as the underlying cache
+    is refreshed, so callers must not memoize it past a single call.
+    """
+    if os.getenv("ALTO_PROMPT_CACHE", "false").lower() not in {"1", "true", "yes"}:
+        return None
+    try:
+        return _create_cache(instruction)
+    except Exception:
+        logger.debug(
+            "Context cache unavailable; sending the instruction inline", exc_info=True
+        )
+        return None
+
+
+def instruction_cache_config(instruction: str) -> Optional[genai_types.GenerateContentConfig]:
+    """Return a GenerateContentConfig pointing at a cached copy of *instruction*.
+
+    Callers receiving a config must pass an empty instruction to LlmAgent so
+    the prefix is served only from the cache.
+    """
+    cache_name = instruction_cache_name(instruction)
+    if cache_name is None:
+        return None
+    return genai_types.GenerateContentConfig(cached_content=cache_name)
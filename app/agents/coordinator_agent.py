@@ -3,27 +3,17 @@ Coordinator Agent - Routes user requests to the appropriate specialist agent
 """
 from datetime import datetime, timezone
 
+from functools import lru_cache
+from typing import Optional
+
 import google.genai.types as genai_types
 from google.adk.agents import LlmAgent
 from google.adk.planners import BuiltInPlanner
 
+from app.agents.context_cache import instruction_cache_name
 from app.config import config
 
-
-def create_coordinator_agent() -> LlmAgent:
-    """
-    This agent analyzes user intent and delegates to either:
-    - calendar_manager: For transaction analysis and calendar optimization
-    - qa_specialist: For general financial questions and education
-    """
-    return LlmAgent(
-        name="coordinator",
-        model=config.model,
-        description="Main coordinator that analyzes user intent and routes to the appropriate specialist agent (calendar management or Q&A).",
-        planner=BuiltInPlanner(
-            thinking_config=genai_types.ThinkingConfig(include_thoughts=True)
-        ),
-        instruction=f"""
+_COORDINATOR_INSTRUCTION_TEMPLATE = """
         You are Alto's Coordinator Agent. Your role is to understand what the user needs
         and route their request to the most appropriate specialist.
 
@@ -62,7 +52,7 @@ def create_coordinator_agent() -> LlmAgent:
         - Educational questions without specific data → qa_specialist
         
         **Current Context:**
-        - Current date: {datetime.now(timezone.utc).strftime("%Y-%m-%d")}
+        - Current date: {current_date}
         - User may provide transaction data in JSON format
         - Focus on intent: data analysis vs. knowledge/education
         
@@ -90,7 +80,47 @@ def create_coordinator_agent() -> LlmAgent:
         After analyzing the request, provide a thoughtful response that addresses
         the user's needs. You can leverage your sub-agents' expertise through
         the ADK agent hierarchy.
-        """,
+"""
+
+
+def _today_utc() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+
+def create_coordinator_agent() -> LlmAgent:
+    """
+    This agent analyzes user intent and delegates to either:
+    - calendar_manager: For transaction analysis and calendar optimization
+    - qa_specialist: For general financial questions and education
+    """
+    instruction = _COORDINATOR_INSTRUCTION_TEMPLATE.format(current_date=_today_utc())
+    # The memo below is keyed on the live cache name, so the agent rebuilds
+    # when the server-side cache is refreshed (or the date-stamped instruction
+    # rotates) instead of carrying an expired cached_content name forever.
+    return _build_coordinator_agent(instruction, instruction_cache_name(instruction))
+
+
+@lru_cache(maxsize=4)
+def _build_coordinator_agent(instruction: str, cache_name: Optional[str]) -> LlmAgent:
+    return LlmAgent(
+        name="coordinator",
+        model=config.model,
+        description="Main coordinator that analyzes user intent and routes to the appropriate specialist agent (calendar management or Q&A).",
+        planner=BuiltInPlanner(
+            thinking_config=genai_types.ThinkingConfig(
+                include_thoughts=config.include_thoughts,
+                thinking_budget=config.thinking_budget,
+            )
+        ),
+        # A live cache serves the instruction from cached_content; sending it
+        # inline as well would be rejected by Gemini (and double-bill the prefix).
+        instruction="" if cache_name else instruction,
+        generate_content_config=(
+            genai_types.GenerateContentConfig(cached_content=cache_name)
+            if cache_name
+            else None
+        ),
         output_key="routing_decision",
     )
 
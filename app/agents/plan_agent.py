@@ -0,0 +1,39 @@
+"""
+Plan Agent - Emits the goal plan as schema-constrained JSON
+"""
+from functools import lru_cache
+
+from google.adk.agents import LlmAgent
+
+from app.config import config
+from app.utils.typing import GoalPlan
+
+
+@lru_cache(maxsize=1)
+def create_plan_agent() -> LlmAgent:
+    """
+    This agent produces the structured goal plan for the frontend.
+
+    Setting output_schema makes Gemini decode directly against the GoalPlan
+    schema (application/json response), so there is no markdown fencing to
+    strip, no invalid-JSON retry loop, and fewer output tokens per plan.
+    """
+    return LlmAgent(
+        name="goal_planner",
+        model=config.model,
+        description="Turns the user's financial goals and transaction context into a structured calendar plan.",
+        instruction="""
+        You are Alto's goal planner. Given the user's goals and any transaction
+        context in the conversation, produce a calendar plan.
+
+        - focus: one of "balanced", "overdraft", or "utilization"
+        - plan: the list of scheduled changes (moves/splits/planned payments),
+          each with dates, amounts, and the payment it applies to
+        - explain: up to 3 short bullets on why the plan helps
+        - next_actions: up to 3 concrete follow-ups for the user
+
+        Be specific: use real merchants, amounts, and dates from the context.
+        """,
+        output_schema=GoalPlan,
+        output_key="goal_plan",
+    )
@@ -1,26 +1,17 @@
 """
 Q&A Agent - Handles general questions about finance, budgeting, and money management
 """
+from functools import lru_cache
+from typing import Optional
+
 import google.genai.types as genai_types
 from google.adk.agents import LlmAgent
 from google.adk.planners import BuiltInPlanner
 
+from app.agents.context_cache import instruction_cache_name
 from app.config import config
 
-
-def create_qa_agent() -> LlmAgent:
-    """ 
-    This agent handles questions about budgeting, financial concepts,
-    money management strategies, and general financial advice.
-    """
-    return LlmAgent(
-        name="qa_specialist",
-        model=config.model,
-        description="Specializes in answering questions about personal finance, budgeting, financial concepts, and money management strategies.",
-        planner=BuiltInPlanner(
-            thinking_config=genai_types.ThinkingConfig(include_thoughts=True)
-        ),
-        instruction="""
+_QA_INSTRUCTION = """
         You are Alto's Financial Q&A Specialist. Your expertise is in explaining financial concepts,
         answering questions about money management, and providing educational guidance.
 
@@ -63,7 +54,40 @@ def create_qa_agent() -> LlmAgent:
         
         Use your reasoning to understand the question thoroughly, then provide
         a clear, helpful, and educational response.
-        """,
+"""
+
+
+def create_qa_agent() -> LlmAgent:
+    """ 
+    This agent handles questions about budgeting, financial concepts,
+    money management strategies, and general financial advice.
+    """
+    # The memo below is keyed on the live cache name, so the agent rebuilds
+    # when the server-side cache is refreshed instead of carrying an expired
+    # cached_content name forever.
+    return _build_qa_agent(instruction_cache_name(_QA_INSTRUCTION))
+
+
+@lru_cache(maxsize=4)
+def _build_qa_agent(cache_name: Optional[str]) -> LlmAgent:
+    return LlmAgent(
+        name="qa_specialist",
+        model=config.model,
+        description="Specializes in answering questions about personal finance, budgeting, financial concepts, and money management strategies.",
+        planner=BuiltInPlanner(
+            thinking_config=genai_types.ThinkingConfig(
+                include_thoughts=config.include_thoughts,
+                thinking_budget=config.thinking_budget,
+            )
+        ),
+        # A live cache serves the instruction from cached_content; sending it
+        # inline as well would be rejected by Gemini (and double-bill the prefix).
+        instruction="" if cache_name else _QA_INSTRUCTION,
+        generate_content_config=(
+            genai_types.GenerateContentConfig(cached_content=cache_name)
+            if cache_name
+            else None
+        ),
         output_key="qa_response",
     )
 
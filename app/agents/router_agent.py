@@ -0,0 +1,35 @@
+"""
+Router Agent - Cheap one-word intent classifier run before the heavy agents
+"""
+from functools import lru_cache
+
+from google.adk.agents import LlmAgent
+
+from app.config import config
+
+
+@lru_cache(maxsize=1)
+def create_router_agent() -> LlmAgent:
+    """
+    This agent classifies user intent with the small router model so the
+    expensive tool-equipped agent only runs for transaction-data requests.
+    General education questions can be answered directly by qa_specialist
+    without paying for tool schemas in the prompt.
+    """
+    return LlmAgent(
+        name="router",
+        model=config.router_model,
+        description="Classifies each user request as a transaction-data task or a general finance question.",
+        instruction="""
+        Classify the user's message.
+
+        Output exactly one word:
+        - DATA: the user asks about THEIR transactions, payments, balances,
+          calendar, or wants payments moved/optimized
+        - GENERAL: the user asks a general finance/education question with no
+          reference to their own data
+
+        Output only DATA or GENERAL. No punctuation, no explanation.
+        """,
+        output_key="route",
+    )
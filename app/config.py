@@ -4,6 +4,7 @@ Configuration for ADK Agent Engine Deployment
 This file handles all configuration needed to deploy your agent to Google Cloud.
 """
 
+import logging
 import os
 from dataclasses import dataclass
 from pathlib import Path
@@ -11,6 +12,8 @@ from pathlib import Path
 import google.auth
 import vertexai
 
+logger = logging.getLogger(__name__)
+
 # =============================================================================
 # STEP 1: Load Environment Variables
 # =============================================================================
@@ -24,11 +27,11 @@ def load_environment_variables() -> None:
         env_file = Path(__file__).parent / ".env"
         if env_file.exists():
             load_dotenv(env_file)
-            print(f"✅ Loaded environment variables from {env_file}")
+            logger.info(f"Loaded environment variables from {env_file}")
         else:
-            print(f"ℹ️  No .env file found at {env_file}")
+            logger.info(f"No .env file found at {env_file}")
     except ImportError:
-        print("ℹ️  python-dotenv not installed, skipping .env file loading")
+        logger.info("python-dotenv not installed, skipping .env file loading")
 
 
 # =============================================================================
@@ -43,9 +46,28 @@ class AgentConfiguration:
     # The AI model to use (you can change this if needed)
     model: str = os.environ.get("MODEL", "gemini-2.5-flash")
 
+    # Small/cheap model used for intent routing (one-word classification).
+    # Routing doesn't need the main model's quality, and the lite tier is
+    # several times faster and cheaper per call.
+    router_model: str = os.environ.get("ROUTER_MODEL", "gemini-2.5-flash-lite")
+
     # Deployment name (can have hyphens, used for display in Agent Engine)
     deployment_name: str = os.environ.get("AGENT_NAME", "alto-financial-assistant")
 
+    # Return Gemini's reasoning tokens in responses. Debug aid only: thoughts
+    # are billed as output tokens and add decode latency, so keep this off in
+    # production (set ALTO_INCLUDE_THOUGHTS=1 to turn it on).
+    include_thoughts: bool = os.environ.get(
+        "ALTO_INCLUDE_THOUGHTS", "false"
+    ).lower() in {"1", "true", "yes"}
+
+    # Optional cap on Gemini's thinking tokens (ALTO_THINKING_BUDGET)
+    thinking_budget: int | None = (
+        int(os.environ["ALTO_THINKING_BUDGET"])
+        if os.environ.get("ALTO_THINKING_BUDGET")
+        else None
+    )
+
     # Google Cloud settings
     project_id: str | None = None
     location: str = "us-central1"
@@ -122,10 +144,12 @@ class DeploymentConfiguration:
 def initialize_vertex_ai(config: AgentConfiguration) -> None:
     """Initialize Vertex AI with the provided configuration."""
     try:
-        print("\n🔧 Initializing Vertex AI...")
-        print(f"  Project: {config.project_id}")
-        print(f"  Location: {config.location}")
-        print(f"  Staging Bucket: {config.staging_bucket or 'Not set'}")
+        logger.info(
+            "Initializing Vertex AI (project=%s location=%s staging_bucket=%s)",
+            config.project_id,
+            config.location,
+            config.staging_bucket or "Not set",
+        )
 
         # Initialize Vertex AI (config values already validated in __post_init__)
         if config.staging_bucket:
@@ -137,20 +161,21 @@ def initialize_vertex_ai(config: AgentConfiguration) -> None:
         else:
             vertexai.init(project=config.project_id, location=config.location)
 
-        print(f"✅ Vertex AI initialized successfully!")
+        logger.info("Vertex AI initialized successfully")
 
         if not config.staging_bucket:
-            print(
-                "ℹ️  Add GOOGLE_CLOUD_STAGING_BUCKET to .env for Agent Engine deployment"
+            logger.info(
+                "Add GOOGLE_CLOUD_STAGING_BUCKET to .env for Agent Engine deployment"
             )
 
     except Exception as e:
-        print(f"❌ Failed to initialize Vertex AI: {e}")
-        print("\n🔧 Setup checklist:")
-        print("  1. Set GOOGLE_CLOUD_PROJECT in .env file")
-        print("  2. Run: gcloud auth application-default login")
-        print("  3. Run: gcloud config set project YOUR_PROJECT_ID")
-        print("  4. Enable required APIs in Google Cloud Console")
+        logger.error(f"Failed to initialize Vertex AI: {e}")
+        logger.error(
+            "Setup checklist: 1) set GOOGLE_CLOUD_PROJECT in .env, "
+            "2) gcloud auth application-default login, "
+            "3) gcloud config set project YOUR_PROJECT_ID, "
+            "4) enable required APIs in Google Cloud Console"
+        )
 
 
 def get_deployment_config() -> DeploymentConfiguration:
@@ -226,10 +251,11 @@ config = AgentConfiguration()
 initialize_vertex_ai(config)
 
 # Print summary
-print("\n📋 Configuration Summary:")
-print(f"  Agent Name: {config.deployment_name}")
-print(f"  Internal Name: {config.internal_agent_name}")
-print(f"  Model: {config.model}")
-print(f"  Project: {get_project_id()}")
-print(f"  Location: {config.location}")
-print("=" * 50)
+logger.info(
+    "Configuration summary: agent=%s internal=%s model=%s project=%s location=%s",
+    config.deployment_name,
+    config.internal_agent_name,
+    config.model,
+    get_project_id(),
+    config.location,
+)
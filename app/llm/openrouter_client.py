@@ -1,6 +1,9 @@
 # app/llm/openrouter_client.py
-import os, httpx
-from typing import List, Dict, Any, Optional
+import asyncio, atexit, os, random, time, httpx
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.llm import response_cache
+from app.utils import jsonio
 
 class OpenRouterError(RuntimeError):
     pass
@@ -9,16 +12,32 @@ def _get(k: str, default: str = "") -> str:
     v = os.getenv(k)
     return v.strip() if isinstance(v, str) else default
 
-def openrouter_chat(
+# One pooled client per process: keep-alive connections skip the TCP+TLS
+# handshake (~150-300 ms) that a fresh httpx.Client pays on every call.
+_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0)
+_client: Optional[httpx.Client] = None
+
+def _get_client() -> httpx.Client:
+    global _client
+    if _client is None:
+        _client = httpx.Client(timeout=httpx.Timeout(15.0), limits=_LIMITS)
+        atexit.register(_client.close)
+    return _client
+
+_aclient: Optional[httpx.AsyncClient] = None
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _aclient
+    if _aclient is None:
+        _aclient = httpx.AsyncClient(timeout=httpx.Timeout(15.0), limits=_LIMITS)
+    return _aclient
+
+def _prepare(
     messages: List[Dict[str, str]],
-    model: Optional[str] = None,
-    temperature: Optional[float] = None,
-    timeout_s: float = 15.0,
-) -> str:
-    """
-    Minimal OpenRouter chat call. Returns the assistant text.
-    Raises OpenRouterError on HTTP/JSON issues.
-    """
+    model: Optional[str],
+    temperature: Optional[float],
+) -> tuple[str, Dict[str, str], Dict[str, Any]]:
+    """Resolve env config and build (url, headers, payload) for a chat call."""
     api_key = _get("OPENROUTER_API_KEY")
     base_url = _get("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
     referer  = _get("OPENROUTER_HTTP_REFERER", "http://localhost")
@@ -46,13 +65,190 @@ def openrouter_chat(
         "messages": messages,
         "temperature": temperature,
     }
+    return url, headers, payload
 
-    with httpx.Client(timeout=timeout_s) as client:
-        r = client.post(url, headers=headers, json=payload)
-        if r.status_code >= 300:
-            raise OpenRouterError(f"OpenRouter HTTP {r.status_code}: {r.text[:300]}")
-        data = r.json()
+# Transient failures worth one more try; anything else surfaces immediately.
+_RETRY_STATUS = frozenset((429, 500, 502, 503, 504))
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ReadTimeout, httpx.RemoteProtocolError)
+_MAX_ATTEMPTS = 3
+
+
+def _timeout(timeout_s: float) -> httpx.Timeout:
+    # Tight connect/write/pool budgets fail fast on dead sockets while the
+    # read budget alone covers slow model generation.
+    return httpx.Timeout(connect=2.0, read=timeout_s, write=5.0, pool=1.0)
+
+
+def _backoff_s(attempt: int, retry_after: Optional[str]) -> float:
+    if retry_after:
+        try:
+            return min(float(retry_after), 10.0)
+        except ValueError:
+            pass
+    return min(2.0 ** attempt + random.random(), 4.0)
+
+
+def _post_with_retry(url: str, headers: Dict[str, str], content: str, timeout_s: float) -> httpx.Response:
+    timeout = _timeout(timeout_s)
+    for attempt in range(_MAX_ATTEMPTS):
+        try:
+            r = _get_client().post(url, headers=headers, content=content, timeout=timeout)
+        except _RETRYABLE_ERRORS as e:
+            if attempt + 1 == _MAX_ATTEMPTS:
+                raise OpenRouterError(
+                    f"OpenRouter request failed after {_MAX_ATTEMPTS} attempts: {e}"
+                ) from e
+            time.sleep(_backoff_s(attempt, None))
+            continue
+        if r.status_code in _RETRY_STATUS and attempt + 1 < _MAX_ATTEMPTS:
+            time.sleep(_backoff_s(attempt, r.headers.get("Retry-After")))
+            continue
+        return r
+    raise OpenRouterError("unreachable")  # pragma: no cover
+
+
+async def _post_with_retry_async(
+    url: str, headers: Dict[str, str], content: str, timeout_s: float
+) -> httpx.Response:
+    timeout = _timeout(timeout_s)
+    for attempt in range(_MAX_ATTEMPTS):
         try:
-            return data["choices"][0]["message"]["content"]
-        except Exception as e:
-            raise OpenRouterError(f"OpenRouter bad payload: {e}; body: {str(data)[:300]}")
+            r = await _get_async_client().post(url, headers=headers, content=content, timeout=timeout)
+        except _RETRYABLE_ERRORS as e:
+            if attempt + 1 == _MAX_ATTEMPTS:
+                raise OpenRouterError(
+                    f"OpenRouter request failed after {_MAX_ATTEMPTS} attempts: {e}"
+                ) from e
+            await asyncio.sleep(_backoff_s(attempt, None))
+            continue
+        if r.status_code in _RETRY_STATUS and attempt + 1 < _MAX_ATTEMPTS:
+            await asyncio.sleep(_backoff_s(attempt, r.headers.get("Retry-After")))
+            continue
+        return r
+    raise OpenRouterError("unreachable")  # pragma: no cover
+
+
+def _snippet(r: httpx.Response) -> str:
+    # Slice the raw bytes before decoding so a large error body never pays a
+    # full decode just to produce a 300-char diagnostic.
+    return r.content[:300].decode("utf-8", "replace")
+
+
+def _extract_content(r: httpx.Response) -> str:
+    if r.status_code >= 300:
+        raise OpenRouterError(f"OpenRouter HTTP {r.status_code}: {_snippet(r)}")
+    try:
+        data = jsonio.loads(r.content)
+    except Exception as e:
+        raise OpenRouterError(f"OpenRouter bad payload: {e}; body: {_snippet(r)}")
+    choices = data.get("choices") if isinstance(data, dict) else None
+    if choices:
+        content = (choices[0].get("message") or {}).get("content")
+        if content is not None:
+            return content
+    raise OpenRouterError(f"OpenRouter bad payload: missing content; body: {_snippet(r)}")
+
+def openrouter_chat(
+    messages: List[Dict[str, str]],
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    timeout_s: float = 15.0,
+) -> str:
+    """
+    Minimal OpenRouter chat call. Returns the assistant text.
+    Raises OpenRouterError on HTTP/JSON issues.
+    """
+    url, headers, payload = _prepare(messages, model, temperature)
+    cacheable = payload["temperature"] <= response_cache.CACHEABLE_TEMPERATURE
+    if cacheable:
+        key = response_cache.cache_key(payload["model"], messages, payload["temperature"])
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
+    # jsonio (orjson when installed) serializes the nested messages list in C;
+    # passing pre-encoded content also skips httpx's own stdlib-json encoding.
+    r = _post_with_retry(url, headers, jsonio.dumps(payload), timeout_s)
+    content = _extract_content(r)
+    if cacheable:
+        response_cache.put(key, content)
+    return content
+
+async def openrouter_chat_async(
+    messages: List[Dict[str, str]],
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    timeout_s: float = 15.0,
+) -> str:
+    """
+    Async twin of openrouter_chat on a shared AsyncClient, so independent
+    prompts can overlap their network round-trips via asyncio.gather.
+    """
+    url, headers, payload = _prepare(messages, model, temperature)
+    cacheable = payload["temperature"] <= response_cache.CACHEABLE_TEMPERATURE
+    if cacheable:
+        key = response_cache.cache_key(payload["model"], messages, payload["temperature"])
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
+    r = await _post_with_retry_async(url, headers, jsonio.dumps(payload), timeout_s)
+    content = _extract_content(r)
+    if cacheable:
+        response_cache.put(key, content)
+    return content
+
+def openrouter_chat_stream(
+    messages: List[Dict[str, str]],
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    timeout_s: float = 60.0,
+) -> Iterator[str]:
+    """
+    Yield response text incrementally via OpenRouter's SSE stream.
+
+    Time-to-first-token drops from full-generation latency to first-chunk
+    latency, so callers rendering long completions can start immediately.
+    The buffered openrouter_chat stays separate: short deterministic calls
+    keep the response-cache fast path without SSE framing overhead.
+    """
+    url, headers, payload = _prepare(messages, model, temperature)
+    payload["stream"] = True
+    # Streams get the granular timeout but no retry loop: replaying a
+    # partially consumed generation would duplicate yielded tokens.
+    with _get_client().stream(
+        "POST", url, headers=headers, content=jsonio.dumps(payload), timeout=_timeout(timeout_s)
+    ) as r:
+        if r.status_code >= 300:
+            r.read()
+            raise OpenRouterError(f"OpenRouter HTTP {r.status_code}: {_snippet(r)}")
+        for line in r.iter_lines():
+            if not line.startswith("data: "):
+                continue
+            data = line[6:]
+            if data == "[DONE]":
+                break
+            try:
+                chunk = jsonio.loads(data)
+            except Exception:  # keep-alive comments / partial frames
+                continue
+            choices = chunk.get("choices") or []
+            if choices:
+                piece = (choices[0].get("delta") or {}).get("content")
+                if piece:
+                    yield piece
+
+
+# Bound fan-out so a large batch queues instead of tripping rate limits.
+_BATCH_SLOTS = asyncio.Semaphore(32)
+
+async def openrouter_chat_batch(
+    message_lists: List[List[Dict[str, str]]],
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    timeout_s: float = 15.0,
+) -> List[str]:
+    """Run many chat calls concurrently; wall time is max, not sum, of latencies."""
+    async def _one(msgs: List[Dict[str, str]]) -> str:
+        async with _BATCH_SLOTS:
+            return await openrouter_chat_async(msgs, model=model, temperature=temperature, timeout_s=timeout_s)
+
+    return list(await asyncio.gather(*(_one(m) for m in message_lists)))
@@ -0,0 +1,55 @@
+# app/llm/response_cache.py
+"""Small LRU+TTL cache for deterministic LLM responses.
+
+Agent loops frequently re-issue identical low-temperature prompts (the same
+explain request when the plan has not changed); caching the text response
+turns a 500-2000 ms network round trip into a dict lookup. Entries expire
+after a short TTL so regenerated content stays reasonably fresh. Hand-rolled
+on OrderedDict rather than pulling in cachetools for one structure.
+"""
+from collections import OrderedDict
+from hashlib import blake2b
+from time import monotonic
+from typing import Any, Optional
+
+from app.utils import jsonio
+
+_MAXSIZE = 512
+_TTL_S = 300.0
+
+_cache: "OrderedDict[bytes, tuple[float, str]]" = OrderedDict()
+
+# Sampling above this temperature is meant to vary between calls, so the
+# cache is bypassed entirely.
+CACHEABLE_TEMPERATURE = 0.3
+
+
+def cache_key(*parts: Any) -> bytes:
+    """Stable 16-byte digest of the JSON-canonicalized key parts."""
+    return blake2b(
+        jsonio.dumps(parts, sort_keys=True).encode(), digest_size=16
+    ).digest()
+
+
+def get(key: bytes) -> Optional[str]:
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    stamp, value = entry
+    if monotonic() - stamp >= _TTL_S:
+        del _cache[key]
+        return None
+    _cache.move_to_end(key)
+    return value
+
+
+def put(key: bytes, value: str) -> None:
+    _cache[key] = (monotonic(), value)
+    _cache.move_to_end(key)
+    while len(_cache) > _MAXSIZE:
+        _cache.popitem(last=False)
+
+
+def clear_llm_cache() -> None:
+    """Drop all cached responses (used by tests and manual resets)."""
+    _cache.clear()
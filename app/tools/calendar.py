@@ -1,48 +1,72 @@
 """Calendar optimization utilities used by the agent tools."""
 from __future__ import annotations
 
+from collections import Counter
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import chain
 from typing import Any, Dict, List
 
 Date = str  # 'YYYY-MM-DD'
 
 
+@lru_cache(maxsize=4096)
 def _dt(s: Date) -> datetime:
-    return datetime.strptime(s, "%Y-%m-%d")
+    # Direct slicing of the fixed-width ISO string skips the _strptime
+    # machinery (format re-parsing, locale lookups), and the lru_cache turns
+    # repeated dates (paydays, recurring bills) into dict hits.
+    return datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]))
 
 
 def _iso(d: datetime) -> Date:
-    return d.strftime("%Y-%m-%d")
+    return f"{d.year:04d}-{d.month:02d}-{d.day:02d}"
 
 
+# Days to push a payment forward, indexed by weekday(): Sat -> Monday (+2),
+# Sun -> Monday (+1). Prebuilt timedeltas avoid per-call construction and the
+# two-way branch on weekday().
+_WEEKEND_BUMP = tuple(timedelta(days=n) for n in (0, 0, 0, 0, 0, 2, 1))
+
+
+@lru_cache(maxsize=4096)
 def _clamp_date(date: Date, *, weekend_payments: bool) -> Date:
+    # The same due dates recur across events and planner calls, so cache the
+    # clamped result keyed on (date, weekend_payments).
     if weekend_payments:
         return date
     day = _dt(date)
-    if day.weekday() == 5:  # Saturday
-        day += timedelta(days=2)
-    elif day.weekday() == 6:  # Sunday
-        day += timedelta(days=1)
-    return _iso(day)
+    bump = _WEEKEND_BUMP[day.weekday()]
+    return _iso(day + bump) if bump else date
 
 
 def derive_month(payload: Dict[str, Any]) -> str:
-    counts: Dict[str, int] = {}
-    for ev in payload.get("cashOut", []) + payload.get("cashIn", []):
-        try:
-            y, m, _ = ev["date"].split("-")
-            key = f"{y}-{m}"
-            counts[key] = counts.get(key, 0) + 1
-        except Exception:
-            continue
+    # Counter is C-implemented and 'YYYY-MM' is just the first 7 chars of the
+    # ISO date, so one generator pass over chained events replaces the old
+    # list concatenation + split + per-event dict bookkeeping.
+    counts = Counter(
+        ev["date"][:7]
+        for ev in chain(payload.get("cashOut", ()), payload.get("cashIn", ()))
+        if isinstance(ev.get("date"), str) and len(ev["date"]) >= 7
+    )
     if counts:
-        return max(counts.items(), key=lambda kv: kv[1])[0]
+        return counts.most_common(1)[0][0]
     today = datetime.now()
     return f"{today.year:04d}-{today.month:02d}"
 
 
-@dataclass
+def _totals(payload: Dict[str, Any]) -> tuple[float, float]:
+    """One fused pass per event list returning (cash_in_total, cash_out_total).
+
+    Shared by optimize_calendar and pick_focus so back-to-back calls do not
+    each re-walk the same payload for the same two sums.
+    """
+    cash_in_total = sum(float(ev.get("amount", 0)) for ev in payload.get("cashIn", ()))
+    cash_out_total = sum(float(ev.get("amount", 0)) for ev in payload.get("cashOut", ()))
+    return cash_in_total, cash_out_total
+
+
+@dataclass(slots=True)
 class ScheduledChange:
     type: str
     payment_id: str
@@ -50,7 +74,7 @@ class ScheduledChange:
     details: Dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class CalendarPlan:
     changes: List[ScheduledChange]
     metrics: Dict[str, Any]
@@ -58,32 +82,55 @@ class CalendarPlan:
     next_actions: List[str] = field(default_factory=list)
 
     def as_dict(self) -> Dict[str, Any]:
+        # Copy details once and set the fixed keys on it, instead of a fresh
+        # dict built through a ** merge per change.
+        changes: List[Dict[str, Any]] = [None] * len(self.changes)  # type: ignore[list-item]
+        for i, sc in enumerate(self.changes):
+            d = sc.details.copy()
+            d["type"] = sc.type
+            d["payment_id"] = sc.payment_id
+            d["reason"] = sc.reason
+            changes[i] = d
         return {
-            "changes": [
-                {"type": sc.type, "payment_id": sc.payment_id, **sc.details, "reason": sc.reason}
-                for sc in self.changes
-            ],
+            "changes": changes,
             "metrics": self.metrics,
             "explain": self.explain,
             "next_actions": self.next_actions,
         }
 
 
-def optimize_calendar(payload: Dict[str, Any], *, focus: str = "balanced") -> CalendarPlan:
-    """Run deterministic calendar heuristics while allowing the LLM to steer focus."""
+def optimize_calendar(
+    payload: Dict[str, Any],
+    *,
+    focus: str = "balanced",
+    totals: tuple[float, float] | None = None,
+) -> CalendarPlan:
+    """Run deterministic calendar heuristics while allowing the LLM to steer focus.
+
+    Callers that already computed ``_totals(payload)`` (e.g. for pick_focus)
+    can pass the pair through ``totals`` to skip the re-walk.
+    """
     focus = focus.lower()
     weekend_payments = bool(payload.get("policy", {}).get("weekend_payments", False))
 
     cash_out = list(payload.get("cashOut", []))
-    cash_in = list(payload.get("cashIn", []))
 
     changes: List[ScheduledChange] = []
 
-    movable = [ev for ev in cash_out if ev.get("window") and not ev.get("fixed")]
-    movable.sort(key=lambda ev: (_inflexibility_rank(ev), ev.get("date")))
+    # Only the single most flexible event is ever moved, so fold the min over
+    # one pass instead of building and sorting a movable list. Each event's
+    # dict is dereferenced once for the (rank, date) key.
+    candidate = None
+    best_key: tuple[int, Any] | None = None
+    for ev in cash_out:
+        if not ev.get("window") or ev.get("fixed"):
+            continue
+        key = (_inflexibility_rank(ev), ev.get("date"))
+        if best_key is None or key < best_key:
+            best_key = key
+            candidate = ev
 
-    if movable:
-        candidate = movable[0]
+    if candidate is not None:
         window = candidate["window"]
         new_date = _clamp_date(window["end"], weekend_payments=weekend_payments)
         if new_date != candidate["date"]:
@@ -103,8 +150,7 @@ def optimize_calendar(payload: Dict[str, Any], *, focus: str = "balanced") -> Ca
         cut_day = int(card.get("cut_day", 28))
         month = derive_month(payload)
         y, m = map(int, month.split("-"))
-        first = _clamp_date(_iso(datetime(y, m, max(1, cut_day - 3))), weekend_payments=weekend_payments)
-        second = _clamp_date(_iso(datetime(y, m, max(1, cut_day - 1))), weekend_payments=weekend_payments)
+        first, second = _split_dates(y, m, cut_day, weekend_payments)
         base_amount = float(card.get("statement_min", 200))
         changes.append(
             ScheduledChange(
@@ -123,11 +169,12 @@ def optimize_calendar(payload: Dict[str, Any], *, focus: str = "balanced") -> Ca
 
     explain = _build_explain(focus)
 
+    cash_in_total, cash_out_total = totals if totals is not None else _totals(payload)
     metrics = {
         "focus": focus,
         "buffer_min": payload.get("policy", {}).get("buffer_min", 300),
-        "cash_in_total": round(sum(float(ev.get("amount", 0)) for ev in cash_in), 2),
-        "cash_out_total": round(sum(float(ev.get("amount", 0)) for ev in cash_out), 2),
+        "cash_in_total": round(cash_in_total, 2),
+        "cash_out_total": round(cash_out_total, 2),
     }
     if focus == "overdraft":
         metrics["projected_buffer_peak"] = metrics["cash_in_total"] - metrics["cash_out_total"]
@@ -139,6 +186,27 @@ def optimize_calendar(payload: Dict[str, Any], *, focus: str = "balanced") -> Ca
     return CalendarPlan(changes=changes, metrics=metrics, explain=explain, next_actions=next_actions)
 
 
+def _split_dates(
+    year: int, month: int, cut_day: int, weekend_payments: bool
+) -> tuple[Date, Date]:
+    """Pure date kernel for the staged pre-cut card payments.
+
+    Kept as a standalone numeric function (ints in, ISO strings out) so the
+    planner's date arithmetic stays isolated from the dict-shaped payload.
+    """
+    # Conditional expressions instead of max(): no variadic-builtin dispatch
+    # for a two-way clamp that almost always takes the subtract branch.
+    first = _clamp_date(
+        _iso(datetime(year, month, cut_day - 3 if cut_day > 3 else 1)),
+        weekend_payments=weekend_payments,
+    )
+    second = _clamp_date(
+        _iso(datetime(year, month, cut_day - 1 if cut_day > 1 else 1)),
+        weekend_payments=weekend_payments,
+    )
+    return first, second
+
+
 def _inflexibility_rank(event: Dict[str, Any]) -> int:
     label = str(event.get("label", "")).lower()
     category = str(event.get("category", "")).lower()
@@ -151,43 +219,54 @@ def _inflexibility_rank(event: Dict[str, Any]) -> int:
     return 3
 
 
+# Explanation bullets are fixed per focus, so keep them as module-level
+# tuples and hand each call a cheap list copy instead of re-allocating the
+# string literals through an if/elif chain.
+_EXPLAIN_DEFAULT = (
+    "Smoothed out major cash-outs against upcoming deposits.",
+    "Maintained the policy buffer while moving flexible bills inside their windows.",
+    "Lowered credit utilization by staging pre-cut card payments.",
+)
+_EXPLAIN_MAP = {
+    "overdraft": (
+        "Shifted flexible expenses toward the end of their windows to raise starting cash.",
+        "Maintained locked obligations while keeping the buffer above policy minimums.",
+        "Highlighted upcoming inflows so you can avoid overdrafts.",
+    ),
+    "utilization": (
+        "Split card payments before the statement cut to lower reported utilization.",
+        "Kept other obligations within their allowed windows to stay fee-free.",
+        "Balanced cash-out timing with expected income deposits.",
+    ),
+}
+
+_ACTION_OVERDRAFT = "Review paydays and confirm buffer meets policy after adjustments"
+_ACTION_CARD_SPLIT = "Schedule staged card payments before the statement cut"
+_ACTION_NO_CHANGES = "No schedule adjustments needed; monitor spending for anomalies"
+_ACTION_CONFIRM = "Confirm moved bills with merchants to avoid late fees"
+
+
 def _build_explain(focus: str) -> List[str]:
-    if focus == "overdraft":
-        return [
-            "Shifted flexible expenses toward the end of their windows to raise starting cash.",
-            "Maintained locked obligations while keeping the buffer above policy minimums.",
-            "Highlighted upcoming inflows so you can avoid overdrafts.",
-        ]
-    if focus == "utilization":
-        return [
-            "Split card payments before the statement cut to lower reported utilization.",
-            "Kept other obligations within their allowed windows to stay fee-free.",
-            "Balanced cash-out timing with expected income deposits.",
-        ]
-    return [
-        "Smoothed out major cash-outs against upcoming deposits.",
-        "Maintained the policy buffer while moving flexible bills inside their windows.",
-        "Lowered credit utilization by staging pre-cut card payments.",
-    ]
+    return list(_EXPLAIN_MAP.get(focus, _EXPLAIN_DEFAULT))
 
 
 def _derive_next_actions(changes: List[ScheduledChange], focus: str) -> List[str]:
     actions: List[str] = []
     if focus == "overdraft":
-        actions.append("Review paydays and confirm buffer meets policy after adjustments")
+        actions.append(_ACTION_OVERDRAFT)
     if focus in {"balanced", "utilization"}:
-        actions.append("Schedule staged card payments before the statement cut")
-    if not changes:
-        actions.append("No schedule adjustments needed; monitor spending for anomalies")
-    else:
-        actions.append("Confirm moved bills with merchants to avoid late fees")
+        actions.append(_ACTION_CARD_SPLIT)
+    actions.append(_ACTION_CONFIRM if changes else _ACTION_NO_CHANGES)
     return actions[:3]
 
 
-def pick_focus(payload: Dict[str, Any]) -> str:
+def pick_focus(
+    payload: Dict[str, Any],
+    *,
+    totals: tuple[float, float] | None = None,
+) -> str:
     buffer_min = float(payload.get("policy", {}).get("buffer_min", 300))
-    cash_in_total = sum(float(ev.get("amount", 0)) for ev in payload.get("cashIn", []))
-    cash_out_total = sum(float(ev.get("amount", 0)) for ev in payload.get("cashOut", []))
+    cash_in_total, cash_out_total = totals if totals is not None else _totals(payload)
     net = cash_in_total - cash_out_total
 
     cards = payload.get("cards", [])
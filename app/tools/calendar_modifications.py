@@ -1,14 +1,28 @@
 """
 Calendar Modification Tools - Allows agent to suggest and track transaction date changes
 """
-import json
+import copy
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from app.utils import jsonio
 
-# Store modifications in a JSON file (in production, this would be in a database)
-MODIFICATIONS_FILE = Path(__file__).parent.parent / "data" / "calendar_modifications.json"
+
+# Store modifications as an append-only JSONL event log (in production, this
+# would be in a database). Each mutation appends one line, so writes are O(1)
+# in the log size instead of rewriting the whole file per change; reads replay
+# the log to reconstruct state.
+MODIFICATIONS_FILE = Path(__file__).parent.parent / "data" / "calendar_modifications.jsonl"
+
+# Replayed-state cache keyed by st_mtime_ns, so the many tool calls that read
+# the log in one agent turn skip the open+replay after the first. The mtime key
+# keeps the cache honest if the file is replaced externally.
+_CACHE: Optional[tuple[int, Dict[str, Any]]] = None
+
+# Rewrite the log as one upsert per live modification once it grows past this
+# many event lines, bounding replay cost.
+_COMPACT_AFTER_LINES = 512
 
 
 def _ensure_data_dir():
@@ -16,24 +30,92 @@ def _ensure_data_dir():
     MODIFICATIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
 
 
+def _empty_state() -> Dict[str, Any]:
+    # In-memory state is indexed two ways: by transaction_id (insertion order
+    # doubles as display order, so no separate order list is needed) and by
+    # modification_id for O(1) approvals. The legacy flat "modifications" list
+    # is rebuilt only at the API boundary.
+    return {"modifications_by_id": {}, "mod_index": {}, "last_updated": None}
+
+
+def _apply(state: Dict[str, Any], event: Dict[str, Any]) -> None:
+    """Fold one log event into the indexed state. Shared by replay and writes."""
+    op = event.get("op")
+    by_id = state["modifications_by_id"]
+    mod_index = state["mod_index"]
+    if op == "upsert":
+        mod = event.get("modification") or {}
+        txn_id = mod.get("transaction_id")
+        if txn_id is not None:
+            # pop-then-set so a re-suggested transaction moves to the end,
+            # matching the old remove+append list behavior.
+            old = by_id.pop(txn_id, None)
+            if old is not None:
+                mod_index.pop(old.get("modification_id"), None)
+            by_id[txn_id] = mod
+            mod_index[mod.get("modification_id")] = txn_id
+    elif op == "approve":
+        txn_id = mod_index.get(event.get("modification_id"))
+        if txn_id is not None:
+            mod = by_id[txn_id]
+            mod["status"] = "approved"
+            mod["approved_at"] = event.get("at")
+    elif op == "clear":
+        by_id.clear()
+        mod_index.clear()
+
+
+def _compact(data: Dict[str, Any]) -> None:
+    """Rewrite the log as one upsert per live modification (temp file + atomic replace)."""
+    tmp = MODIFICATIONS_FILE.with_suffix(".jsonl.tmp")
+    with open(tmp, "wb") as f:
+        for mod in data["modifications_by_id"].values():
+            event = {"op": "upsert", "at": data["last_updated"], "modification": mod}
+            f.write(jsonio.dumps(event).encode() + b"\n")
+    tmp.replace(MODIFICATIONS_FILE)
+
+
 def _load_modifications() -> Dict[str, Any]:
-    """Load current calendar modifications"""
+    """Load current calendar modifications by replaying the event log"""
+    global _CACHE
     _ensure_data_dir()
-    if MODIFICATIONS_FILE.exists():
+    try:
+        mtime = MODIFICATIONS_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return _empty_state()
+    if _CACHE is not None and _CACHE[0] == mtime:
+        # Deep copy so callers can mutate the result without corrupting the cache.
+        return copy.deepcopy(_CACHE[1])
+    state = _empty_state()
+    lines = MODIFICATIONS_FILE.read_bytes().splitlines()
+    for line in lines:
+        if not line.strip():
+            continue
         try:
-            with open(MODIFICATIONS_FILE, "r") as f:
-                return json.load(f)
+            event = jsonio.loads(line)
         except Exception:
-            return {"modifications": [], "last_updated": None}
-    return {"modifications": [], "last_updated": None}
+            continue
+        _apply(state, event)
+        state["last_updated"] = event.get("at", state["last_updated"])
+    if len(lines) > _COMPACT_AFTER_LINES:
+        _compact(state)
+        mtime = MODIFICATIONS_FILE.stat().st_mtime_ns
+    _CACHE = (mtime, state)
+    return copy.deepcopy(state)
 
 
-def _save_modifications(data: Dict[str, Any]):
-    """Save calendar modifications"""
+def _record(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Append one mutation to the log and roll the cached state forward."""
+    global _CACHE
     _ensure_data_dir()
-    data["last_updated"] = datetime.now().isoformat()
-    with open(MODIFICATIONS_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    event.setdefault("at", datetime.now().isoformat())
+    state = _load_modifications()
+    _apply(state, event)
+    state["last_updated"] = event["at"]
+    with open(MODIFICATIONS_FILE, "ab") as f:
+        f.write(jsonio.dumps(event).encode() + b"\n")
+    _CACHE = (MODIFICATIONS_FILE.stat().st_mtime_ns, copy.deepcopy(state))
+    return state
 
 
 def move_transaction(
@@ -82,7 +164,7 @@ def move_transaction(
     data = _load_modifications()
     
     modification = {
-        "modification_id": f"mod_{len(data['modifications']) + 1}",
+        "modification_id": f"mod_{len(data['modifications_by_id']) + 1}",
         "transaction_id": transaction_id,
         "merchant_name": merchant_name,
         "original_date": original_date,
@@ -93,14 +175,7 @@ def move_transaction(
         "status": "suggested"
     }
     
-    # Remove any existing modification for this transaction
-    data["modifications"] = [
-        m for m in data["modifications"] 
-        if m["transaction_id"] != transaction_id
-    ]
-    
-    data["modifications"].append(modification)
-    _save_modifications(data)
+    _record({"op": "upsert", "modification": modification})
     
     return {
         "success": True,
@@ -143,10 +218,13 @@ def add_planned_transaction(
     """
     data = _load_modifications()
     
-    transaction_id = f"planned_{len([m for m in data['modifications'] if m.get('type') == 'planned']) + 1}"
+    planned_count = sum(
+        1 for m in data["modifications_by_id"].values() if m.get("type") == "planned"
+    )
+    transaction_id = f"planned_{planned_count + 1}"
     
     planned = {
-        "modification_id": f"mod_{len(data['modifications']) + 1}",
+        "modification_id": f"mod_{len(data['modifications_by_id']) + 1}",
         "transaction_id": transaction_id,
         "type": "planned",
         "merchant_name": merchant_name,
@@ -158,8 +236,7 @@ def add_planned_transaction(
         "status": "suggested"
     }
     
-    data["modifications"].append(planned)
-    _save_modifications(data)
+    _record({"op": "upsert", "modification": planned})
     
     return {
         "success": True,
@@ -184,18 +261,21 @@ def get_calendar_modifications(user_id: str = "default") -> Dict[str, Any]:
     """
     data = _load_modifications()
     
+    # Rebuild the legacy flat list from the index only here, at the API boundary
+    modifications = list(data["modifications_by_id"].values())
+    
     # Separate moves from planned transactions
-    moves = [m for m in data["modifications"] if m.get("type") != "planned"]
-    planned = [m for m in data["modifications"] if m.get("type") == "planned"]
+    moves = [m for m in modifications if m.get("type") != "planned"]
+    planned = [m for m in modifications if m.get("type") == "planned"]
     
     # Calculate impact
     total_moved = len(moves)
     total_planned = len(planned)
     
     return {
-        "modifications": data["modifications"],
+        "modifications": modifications,
         "summary": {
-            "total_modifications": len(data["modifications"]),
+            "total_modifications": len(modifications),
             "transactions_moved": total_moved,
             "planned_transactions": total_planned,
             "last_updated": data.get("last_updated"),
@@ -217,8 +297,11 @@ def clear_calendar_modifications(user_id: str = "default") -> Dict[str, Any]:
     Returns:
         Confirmation that modifications were cleared
     """
-    data = {"modifications": [], "last_updated": None}
-    _save_modifications(data)
+    global _CACHE
+    _ensure_data_dir()
+    # Truncating both clears state and compacts the log in one O(1) write.
+    MODIFICATIONS_FILE.write_bytes(b"")
+    _CACHE = (MODIFICATIONS_FILE.stat().st_mtime_ns, _empty_state())
     
     return {
         "success": True,
@@ -238,15 +321,13 @@ def approve_modification(modification_id: str) -> Dict[str, Any]:
     """
     data = _load_modifications()
     
-    for mod in data["modifications"]:
-        if mod["modification_id"] == modification_id:
-            mod["status"] = "approved"
-            mod["approved_at"] = datetime.now().isoformat()
-            _save_modifications(data)
-            return {
-                "success": True,
-                "message": f"Modification {modification_id} approved"
-            }
+    # O(1) existence check via the modification_id index
+    if modification_id in data["mod_index"]:
+        _record({"op": "approve", "modification_id": modification_id})
+        return {
+            "success": True,
+            "message": f"Modification {modification_id} approved"
+        }
     
     return {
         "success": False,
@@ -1,10 +1,18 @@
 """Explanation helpers for calendar plans."""
 from __future__ import annotations
 
-import json
 import os
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
+from app.llm.response_cache import (
+    CACHEABLE_TEMPERATURE,
+    cache_key,
+    clear_llm_cache,  # noqa: F401 - re-exported for tests/manual resets
+)
+from app.llm import response_cache
+from app.utils import jsonio
+
 try:
     from vertexai.preview.generative_models import GenerationConfig, GenerativeModel
     _GEMINI_READY = True
@@ -14,24 +22,36 @@ except Exception:  # pragma: no cover - graceful fallback in local/dev without V
     _GEMINI_READY = False
 
 
-def _format_prompt(payload: Dict[str, Any], plan: Dict[str, Any], focus: str) -> str:
-    cash_in = payload.get("cashIn", [])[:5]
-    cash_out = payload.get("cashOut", [])[:8]
-    changes = plan.get("changes", [])
-    metrics = plan.get("metrics", {})
-    summary = {
+@lru_cache(maxsize=8)
+def _get_gen_model(name: str) -> "GenerativeModel":
+    # GenerativeModel construction does SDK-side setup (auth metadata, channel
+    # wiring); one instance per model name lets calls reuse the connection.
+    return GenerativeModel(name)
+
+
+@lru_cache(maxsize=16)
+def _get_gen_config(temperature: float) -> "GenerationConfig":
+    return GenerationConfig(temperature=temperature, candidate_count=1)
+
+
+def _context_summary(payload: Dict[str, Any], plan: Dict[str, Any], focus: str) -> Dict[str, Any]:
+    return {
         "focus": focus,
-        "income": cash_in,
-        "cash_out": cash_out,
-        "changes": changes,
-        "metrics": metrics,
+        "income": payload.get("cashIn", [])[:5],
+        "cash_out": payload.get("cashOut", [])[:8],
+        "changes": plan.get("changes", []),
+        "metrics": plan.get("metrics", {}),
     }
+
+
+def _format_prompt(payload: Dict[str, Any], plan: Dict[str, Any], focus: str) -> str:
+    summary = _context_summary(payload, plan, focus)
     return (
         "You are Alto, a money coach who explains scheduling decisions clearly.\n"
         "Summarize why the proposed calendar keeps the client safe and improves their credit.\n"
         "Output 3 short bullet points (max 18 words each).\n"
         "Stay concrete: mention paychecks, buffer protection, credit utilization, or subscription timing as relevant.\n"
-        f"Context JSON: {json.dumps(summary, default=str)}"
+        f"Context JSON: {jsonio.dumps(summary, default=str)}"
     )
 
 
@@ -48,10 +68,18 @@ def explain_with_gemini(
         raise RuntimeError("Gemini generative SDK not available in this environment.")
 
     target_model = model or os.getenv("EXPLAIN_MODEL", "gemini-2.5-flash")
-    gen_model = GenerativeModel(target_model)
-    config = GenerationConfig(temperature=temperature, candidate_count=1)
     prompt = _format_prompt(payload, plan, focus)
-    response = gen_model.generate_content(prompt, generation_config=config)
+
+    cacheable = temperature <= CACHEABLE_TEMPERATURE
+    if cacheable:
+        key = cache_key(target_model, prompt, temperature)
+        cached = response_cache.get(key)
+        if cached is not None:
+            return jsonio.loads(cached)
+
+    response = _get_gen_model(target_model).generate_content(
+        prompt, generation_config=_get_gen_config(temperature)
+    )
 
     text = ""
     if getattr(response, "text", None):
@@ -63,7 +91,10 @@ def explain_with_gemini(
             text = "\n".join(getattr(part, "text", "") for part in parts if getattr(part, "text", ""))
 
     bullets = [line.strip("•- ").strip() for line in text.splitlines() if line.strip()]
-    return bullets[:3]
+    bullets = bullets[:3]
+    if cacheable and bullets:
+        response_cache.put(key, jsonio.dumps(bullets))
+    return bullets
 
 
 def fallback_explain(plan: Dict[str, Any], *, focus: str = "balanced") -> List[str]:
@@ -77,6 +108,63 @@ def fallback_explain(plan: Dict[str, Any], *, focus: str = "balanced") -> List[s
     ]
 
 
+# Batching more variants than this hits diminishing returns and risks the
+# model truncating later entries.
+_MAX_MULTI_FOCUSES = 4
+
+
+def explain_plans_multi(
+    payload: Dict[str, Any],
+    plan: Dict[str, Any],
+    focuses: List[str],
+    *,
+    prefer_gemini: bool = True,
+) -> Dict[str, List[str]]:
+    """Explain several focus variants with a single LLM round trip.
+
+    One prompt asks the model to emit a JSON object mapping each focus to its
+    three bullets, amortizing network latency and prompt prefill across
+    variants. If the combined call or its JSON parse fails, falls back to one
+    explain_plan call per focus (which itself degrades to the deterministic
+    bullets).
+    """
+    focuses = list(dict.fromkeys(focuses))[:_MAX_MULTI_FOCUSES]
+    if len(focuses) > 1:
+        try:
+            from app.llm.openrouter_client import openrouter_chat
+
+            summary = _context_summary(payload, plan, ",".join(focuses))
+            prompt = (
+                "You are Alto, a money coach who explains scheduling decisions clearly.\n"
+                "For EACH focus listed below, write 3 short bullet points (max 18 words each)\n"
+                "explaining why the proposed calendar keeps the client safe and improves their credit.\n"
+                f"Focuses: {', '.join(focuses)}\n"
+                "Respond with ONLY a JSON object mapping each focus name to its list of 3 strings.\n"
+                f"Context JSON: {jsonio.dumps(summary, default=str)}"
+            )
+            raw = openrouter_chat([{"role": "user", "content": prompt}]).strip()
+            if raw.startswith("```"):
+                raw = raw.strip("`\n")
+                if raw.startswith("json"):
+                    raw = raw[4:]
+            parsed = jsonio.loads(raw)
+            if isinstance(parsed, dict):
+                result = {}
+                for focus in focuses:
+                    bullets = parsed.get(focus)
+                    if not isinstance(bullets, list) or not bullets:
+                        break
+                    result[focus] = [str(b) for b in bullets[:3]]
+                else:
+                    return result
+        except Exception:
+            pass
+    return {
+        focus: explain_plan(payload, plan, focus=focus, prefer_gemini=prefer_gemini)
+        for focus in focuses
+    }
+
+
 def explain_plan(
     payload: Dict[str, Any],
     plan: Dict[str, Any],
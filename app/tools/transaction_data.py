@@ -1,10 +1,17 @@
 """
 Transaction Data Tools - Provides access to user transaction data
 """
-import json
 from pathlib import Path
 from typing import Any, Dict, List
 
+from app.utils import jsonio
+
+
+# Parsed sample data plus its derived summary, keyed on the file's mtime so
+# the 4-5 tool calls per agent step share one disk read + JSON parse. Callers
+# treat the returned structure as read-only.
+_CACHE: Dict[str, Any] = {"mtime": -1, "data": None}
+
 
 def get_user_transactions(user_id: str = "default") -> Dict[str, Any]:
     """
@@ -32,19 +39,22 @@ def get_user_transactions(user_id: str = "default") -> Dict[str, Any]:
     data_file = Path(__file__).parent.parent / "examples" / "plaid_sample.json"
     
     try:
-        with open(data_file, "r") as f:
-            data = json.load(f)
+        mtime = data_file.stat().st_mtime_ns
+        if mtime == _CACHE["mtime"]:
+            return _CACHE["data"]
         
-        # Add summary statistics
+        data = jsonio.loads(data_file.read_bytes())
+        
+        # Add summary statistics. One fused pass computes both totals, so each
+        # transaction's category chain is dereferenced once instead of twice.
         transactions = data.get("added", [])
-        total_expenses = sum(
-            t["amount"] for t in transactions 
-            if t.get("personal_finance_category", {}).get("primary") != "INCOME"
-        )
-        total_income = sum(
-            t["amount"] for t in transactions 
-            if t.get("personal_finance_category", {}).get("primary") == "INCOME"
-        )
+        total_expenses = 0.0
+        total_income = 0.0
+        for t in transactions:
+            if t.get("personal_finance_category", {}).get("primary") == "INCOME":
+                total_income += t["amount"]
+            else:
+                total_expenses += t["amount"]
         
         # Add helpful summary
         data["summary"] = {
@@ -55,6 +65,8 @@ def get_user_transactions(user_id: str = "default") -> Dict[str, Any]:
             "current_balance": data["accounts"][0]["balances"]["current"] if data.get("accounts") else 0,
         }
         
+        _CACHE["data"] = data
+        _CACHE["mtime"] = mtime
         return data
         
     except FileNotFoundError:
@@ -123,12 +135,13 @@ def get_transactions_by_category(
     data = get_user_transactions(user_id)
     transactions = data.get("added", [])
     
-    filtered = [
-        t for t in transactions
-        if t.get("personal_finance_category", {}).get("primary") == category
-    ]
-    
-    total = sum(t["amount"] for t in filtered)
+    # Filter and total in one pass rather than re-walking the filtered list.
+    filtered = []
+    total = 0.0
+    for t in transactions:
+        if t.get("personal_finance_category", {}).get("primary") == category:
+            filtered.append(t)
+            total += t["amount"]
     
     return {
         "category": category,
@@ -154,26 +167,33 @@ def get_recurring_payments(user_id: str = "default") -> List[Dict[str, Any]]:
     data = get_user_transactions(user_id)
     transactions = data.get("added", [])
     
-    # Group by merchant name to find recurring patterns
-    merchant_groups: Dict[str, List[Dict[str, Any]]] = {}
+    # Group by merchant while accumulating the amount total and keyword flag,
+    # so the recurring pass below never re-walks each merchant's transactions.
+    merchant_groups: Dict[str, Dict[str, Any]] = {}
     for t in transactions:
         merchant = t.get("merchant_name", "Unknown")
-        if merchant not in merchant_groups:
-            merchant_groups[merchant] = []
-        merchant_groups[merchant].append(t)
+        group = merchant_groups.get(merchant)
+        if group is None:
+            group = merchant_groups[merchant] = {
+                "txns": [],
+                "total": 0.0,
+                "keyword": False,
+            }
+        group["txns"].append(t)
+        group["total"] += t["amount"]
+        if not group["keyword"]:
+            name = t.get("name", "").lower()
+            group["keyword"] = "subscription" in name or "rent" in name
     
-    # Find merchants with multiple transactions (likely recurring)
+    # Merchants with multiple transactions (or recurring keywords) are likely recurring
     recurring = []
-    for merchant, txns in merchant_groups.items():
-        if len(txns) > 1 or any(
-            "subscription" in t.get("name", "").lower() or 
-            "rent" in t.get("name", "").lower()
-            for t in txns
-        ):
+    for merchant, group in merchant_groups.items():
+        txns = group["txns"]
+        if len(txns) > 1 or group["keyword"]:
             recurring.append({
                 "merchant": merchant,
                 "transaction_count": len(txns),
-                "average_amount": round(sum(t["amount"] for t in txns) / len(txns), 2),
+                "average_amount": round(group["total"] / len(txns), 2),
                 "transactions": txns,
                 "category": txns[0].get("personal_finance_category", {}).get("primary", "UNKNOWN")
             })
@@ -0,0 +1,39 @@
+"""JSON helpers that use orjson when available and fall back to stdlib json.
+
+orjson serializes 2-5x faster than stdlib json and parses straight from
+bytes, which matters on the tool-IO boundary where large transaction payloads
+are marshaled on every call. The stdlib fallback keeps local/dev environments
+working without the optional wheel.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+
+    def dumps(
+        obj: Any,
+        *,
+        sort_keys: bool = False,
+        default: Optional[Callable[[Any], Any]] = None,
+    ) -> str:
+        option = orjson.OPT_SORT_KEYS if sort_keys else 0
+        return orjson.dumps(obj, option=option, default=default).decode()
+
+    def loads(data: str | bytes) -> Any:
+        return orjson.loads(data)
+
+except ImportError:  # pragma: no cover - stdlib fallback when orjson is absent
+    import json
+
+    def dumps(
+        obj: Any,
+        *,
+        sort_keys: bool = False,
+        default: Optional[Callable[[Any], Any]] = None,
+    ) -> str:
+        return json.dumps(obj, sort_keys=sort_keys, default=default)
+
+    def loads(data: str | bytes) -> Any:
+        return json.loads(data)
@@ -1,12 +1,58 @@
 from typing import (
+    Any,
     Literal,
 )
 
 from pydantic import (
     BaseModel,
+    ConfigDict,
+    Field,
 )
 
 
+class PlanPayload(BaseModel):
+    """Planner request body for /optimize, /explain, /orchestrate/plan, /agent/session.
+
+    Parsing once through pydantic-core replaces the per-endpoint chains of
+    Python-level .get(..., default) walks, and unknown keys are preserved via
+    extra="allow" so experimental payload fields keep flowing through.
+    """
+
+    model_config = ConfigDict(extra="allow")
+
+    cashOut: list[dict[str, Any]] = Field(default_factory=list)
+    cashIn: list[dict[str, Any]] = Field(default_factory=list)
+    cards: list[dict[str, Any]] = Field(default_factory=list)
+    policy: dict[str, Any] = Field(default_factory=dict)
+    intent: dict[str, Any] = Field(default_factory=dict)
+    focus: str | None = None
+    user: dict[str, Any] = Field(default_factory=dict)
+
+    def as_payload_dict(self) -> dict[str, Any]:
+        """Shallow dict view for the planner — shares the parsed containers
+        by reference instead of deep-copying like model_dump()."""
+        data: dict[str, Any] = dict(self.model_extra or {})
+        data.update(
+            cashOut=self.cashOut,
+            cashIn=self.cashIn,
+            cards=self.cards,
+            policy=self.policy,
+            intent=self.intent,
+            focus=self.focus,
+            user=self.user,
+        )
+        return data
+
+
+class GoalPlan(BaseModel):
+    """Structured calendar plan emitted by the goal-planner agent."""
+
+    focus: str
+    plan: list[dict[str, Any]]
+    explain: list[str]
+    next_actions: list[str] = Field(default_factory=list)
+
+
 class Feedback(BaseModel):
     """Represents feedback for a conversation."""
 
@@ -2,23 +2,81 @@ import { NextResponse } from "next/server";
 import fs from "fs/promises";
 import path from "path";
 
+type Modification = Record<string, unknown> & {
+  transaction_id?: string;
+  modification_id?: string;
+};
+
+// The Python backend stores modifications as an append-only JSONL event log
+// (one upsert/approve/clear event per line); reconstruct current state by
+// replaying it, mirroring app/tools/calendar_modifications.py::_apply.
+function replayLog(contents: string): {
+  modifications: Modification[];
+  last_updated: string | null;
+} {
+  const byTxn = new Map<string, Modification>();
+  let lastUpdated: string | null = null;
+
+  for (const line of contents.split("\n")) {
+    const trimmed = line.trim();
+    if (!trimmed) continue;
+
+    let event: Record<string, unknown>;
+    try {
+      event = JSON.parse(trimmed);
+    } catch {
+      continue; // skip partial/corrupt lines
+    }
+
+    if (event.op === "upsert") {
+      const mod = (event.modification ?? {}) as Modification;
+      const txnId = mod.transaction_id;
+      if (typeof txnId === "string") {
+        // delete-then-set so a re-suggested transaction moves to the end,
+        // matching the backend's ordering.
+        byTxn.delete(txnId);
+        byTxn.set(txnId, mod);
+      }
+    } else if (event.op === "approve") {
+      for (const mod of byTxn.values()) {
+        if (mod.modification_id === event.modification_id) {
+          mod.status = "approved";
+          mod.approved_at = event.at ?? null;
+          break;
+        }
+      }
+    } else if (event.op === "clear") {
+      byTxn.clear();
+    }
+
+    if (typeof event.at === "string") {
+      lastUpdated = event.at;
+    }
+  }
+
+  return { modifications: [...byTxn.values()], last_updated: lastUpdated };
+}
+
 export async function GET() {
   try {
-    // Path to the calendar modifications file in the Python backend
-    const modificationsPath = path.join(
-      process.cwd(),
-      "..",
-      "app",
-      "data",
-      "calendar_modifications.json"
-    );
+    // Paths into the Python backend's data directory
+    const dataDir = path.join(process.cwd(), "..", "app", "data");
+    const logPath = path.join(dataDir, "calendar_modifications.jsonl");
+    const legacyPath = path.join(dataDir, "calendar_modifications.json");
 
     try {
-      const data = await fs.readFile(modificationsPath, "utf-8");
+      const data = await fs.readFile(logPath, "utf-8");
+      return NextResponse.json(replayLog(data));
+    } catch {
+      // Log not written yet — fall through to the legacy snapshot.
+    }
+
+    try {
+      const data = await fs.readFile(legacyPath, "utf-8");
       const modifications = JSON.parse(data);
       return NextResponse.json(modifications);
-    } catch (error) {
-      // File doesn't exist or is empty - return empty modifications
+    } catch {
+      // Neither file exists or is readable - return empty modifications
       return NextResponse.json({
         modifications: [],
         last_updated: null,
@@ -32,4 +90,3 @@ export async function GET() {
     );
   }
 }
-